@@ -2,14 +2,239 @@
 List Operations Lab - Sound Pattern Generator
 A console application for demonstrating list operations in Python.
 """
+import functools
+import hashlib
+import itertools
 import random
+import sys
+from array import array
 
-def create_bass_pattern(length: int) -> list:
+from pattern_types import Pattern, PatternRows, PatternView, RepeatedPattern, Rope, like
+from pattern_history import PatternHistory
+from pattern_player import FileSink, PatternPlayer
+from terminal_ui import TerminalUI
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path is always available
+    np = None
+
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
+BACKENDS = (BACKEND_PYTHON, BACKEND_NUMPY)
+
+_default_backend = BACKEND_PYTHON
+_numpy_rng = None
+
+# Sequence types accepted by the list operation functions
+PATTERN_TYPES = (list, Pattern, PatternView, RepeatedPattern, Rope)
+
+# Block size used when vectorizing the bounded ambient random walk
+_WALK_BLOCK = 1024
+
+def set_backend(backend: str) -> None:
+    """
+    Sets the default generation backend used by the pattern creation functions.
+    
+    Parameters:
+    backend (str): Either "python" or "numpy"
+    """
+    global _default_backend
+    if backend not in BACKENDS:
+        raise ValueError("Backend must be 'python' or 'numpy'.")
+    _default_backend = backend
+
+def get_backend() -> str:
+    """Returns the default generation backend."""
+    return _default_backend
+
+def _resolve_backend(backend: str) -> str:
+    """Resolves the backend for a call, falling back to Python when NumPy is absent."""
+    if backend is None:
+        backend = _default_backend
+    if backend not in BACKENDS:
+        raise ValueError("Backend must be 'python' or 'numpy'.")
+    if backend == BACKEND_NUMPY and np is None:
+        return BACKEND_PYTHON
+    return backend
+
+def _get_numpy_rng():
+    """Returns the lazily created module-level NumPy generator."""
+    global _numpy_rng
+    if _numpy_rng is None:
+        _numpy_rng = np.random.default_rng()
+    return _numpy_rng
+
+def _is_seed(rng) -> bool:
+    """Checks whether rng is an integer seed."""
+    return isinstance(rng, int) and not isinstance(rng, bool)
+
+def _seed_value(seed: int) -> int:
+    """Returns the seed NumPy accepts; like random.seed, a negative seed acts as its absolute value."""
+    return abs(seed)
+
+def _python_rng(rng):
+    """
+    Resolves rng to an object with the random.Random interface.
+    
+    None selects the global random module state, an int seeds a new
+    random.Random, and a NumPy Generator seeds a random.Random from its
+    own stream so the result stays reproducible.
+    """
+    if rng is None or rng is random:
+        return random
+    if isinstance(rng, random.Random):
+        return rng
+    if _is_seed(rng):
+        return random.Random(rng)
+    if np is not None and isinstance(rng, np.random.Generator):
+        return random.Random(int(rng.integers(2 ** 63)))
+    raise ValueError("Rng must be None, an integer seed, random.Random or numpy.random.Generator.")
+
+def _numpy_generator(rng):
+    """Resolves rng to a numpy.random.Generator (see _python_rng)."""
+    if rng is None:
+        return _get_numpy_rng()
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if _is_seed(rng):
+        return np.random.default_rng(_seed_value(rng))
+    if isinstance(rng, random.Random):
+        return np.random.default_rng(rng.getrandbits(128))
+    raise ValueError("Rng must be None, an integer seed, random.Random or numpy.random.Generator.")
+
+def _derive_seed(seed: int, index: int) -> int:
+    """Derives a 256-bit substream seed from a root seed and stream index."""
+    digest = hashlib.sha256(f"{seed}/{index}".encode()).digest()
+    return int.from_bytes(digest, "big")
+
+def spawn_streams(seed: int, count: int, backend: str = None) -> list:
+    """
+    Splits a seed into independent random streams, one per worker.
+    
+    The same seed and count always give the same streams, and each stream
+    is owned by a single worker, so parallel generation is deterministic
+    and needs no shared state or locking.
+    
+    Parameters:
+    seed (int): Root seed; a negative seed acts as its absolute value
+    count (int): Number of streams to create
+    backend (str): "python" for random.Random streams, "numpy" for Generators
+    
+    Returns:
+    list: Independent random streams
+    """
+    if not _is_seed(seed):
+        raise ValueError("Seed must be an integer.")
+    if not isinstance(count, int) or count <= 0:
+        raise ValueError("Count must be a positive integer.")
+    
+    return [get_stream(seed, index, backend) for index in range(count)]
+
+def get_stream(seed: int, index: int, backend: str = None):
+    """
+    Returns a single substream of a seed, identical to spawn_streams(seed, n)[index].
+    
+    Parameters:
+    seed (int): Root seed; a negative seed acts as its absolute value
+    index (int): Zero-based stream index
+    backend (str): "python" for a random.Random stream, "numpy" for a Generator
+    
+    Returns:
+    The random stream for that index
+    """
+    if not _is_seed(seed):
+        raise ValueError("Seed must be an integer.")
+    if not _is_seed(index) or index < 0:
+        raise ValueError("Index must be a non-negative integer.")
+    
+    seed = _seed_value(seed)
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    
+    return random.Random(_derive_seed(seed, index))
+
+def _numpy_result(pattern, as_array: bool):
+    """Converts a NumPy pattern to the requested return type."""
+    pattern = pattern.astype(np.uint8)
+    return pattern if as_array else pattern.tolist()
+
+def _numpy_bass(shape: tuple, generator):
+    """Vectorized bass patterns: beats every 4 steps at 60-100, 20-50 elsewhere."""
+    pattern = generator.integers(20, 51, size=shape)
+    pattern[..., ::4] = generator.integers(60, 101, size=pattern[..., ::4].shape)
+    return pattern
+
+def _numpy_melody(shape: tuple, generator):
+    """Vectorized melody patterns: base 40-70 with +/-20 variation, clipped to 0-100."""
+    base = generator.integers(40, 71, size=shape[:-1] + (1,))
+    return np.clip(base + generator.integers(-20, 21, size=shape), 0, 100)
+
+def _numpy_percussion(shape: tuple, generator):
+    """Vectorized percussion patterns: 80-100 on even steps, 0-10 on odd steps."""
+    pattern = generator.integers(0, 11, size=shape)
+    pattern[..., ::2] = generator.integers(80, 101, size=pattern[..., ::2].shape)
+    return pattern
+
+def _numpy_ambient(shape: tuple, generator, values=None):
+    """
+    Vectorized ambient random walks using a cumulative sum plus clipping.
+    
+    A walk clamped at one bound only is a cumulative sum corrected by the
+    running maximum of its excursions past that bound. Each row is built
+    in phases: the unclamped walk decides which bound is hit first, the
+    one-sided clamped walk is exact until it crosses the opposite bound,
+    and the next phase restarts from that bound. Columns are processed in
+    blocks so each phase touches a bounded window, and the result matches
+    step-by-step clamping exactly. values optionally gives each row's
+    value before its first step (used to continue a walk).
+    """
+    rows = int(np.prod(shape[:-1], dtype=np.int64))
+    length = shape[-1]
+    if values is None:
+        values = generator.integers(30, 71, size=rows)
+    steps = generator.integers(-5, 6, size=(rows, length))
+    pattern = np.empty((rows, length), dtype=np.int64)
+    for start in range(0, length, _WALK_BLOCK):
+        block_steps = steps[:, start:start + _WALK_BLOCK]
+        width = block_steps.shape[1]
+        columns = np.arange(width)
+        result = pattern[:, start:start + width]
+        active = np.arange(rows)
+        position = np.zeros(rows, dtype=np.int64)
+        origin = values.copy()
+        while len(active):
+            pending = columns >= position[:, None]
+            walk = origin[:, None] + np.cumsum(np.where(pending, block_steps[active], 0), axis=1)
+            below = (walk < 10).any(axis=1)
+            above = (walk > 90).any(axis=1)
+            first_below = np.where(below, (walk < 10).argmax(axis=1), width)
+            first_above = np.where(above, (walk > 90).argmax(axis=1), width)
+            low_first = first_below < first_above
+            raised = walk + np.maximum(np.maximum.accumulate(10 - walk, axis=1), 0)
+            lowered = walk - np.maximum(np.maximum.accumulate(walk - 90, axis=1), 0)
+            clamped = np.where(low_first[:, None], raised, lowered)
+            crossing = np.where(low_first[:, None], clamped > 90, clamped < 10)
+            crossed = crossing.any(axis=1)
+            end = np.where(crossed, crossing.argmax(axis=1), width)
+            keep = pending & (columns < end[:, None])
+            result[active] = np.where(keep, clamped, result[active])
+            bound = np.where(low_first, 90, 10)
+            active, end, bound = active[crossed], end[crossed], bound[crossed]
+            result[active, end] = bound
+            origin, position = bound, end + 1
+        values = result[:, -1]
+    return pattern.reshape(shape)
+
+def create_bass_pattern(length: int, backend: str = None, as_array: bool = False, rng=None) -> list:
     """
     Creates a bass pattern with strong beats and lower values.
     
     Parameters:
     length (int): Length of the pattern to generate
+    backend (str): "python" or "numpy"; defaults to the module backend
+    as_array (bool): Return a NumPy array instead of a list (numpy backend only)
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
     
     Returns:
     list: A list of integers representing amplitude values (0-100)
@@ -17,17 +242,25 @@ def create_bass_pattern(length: int) -> list:
     if not isinstance(length, int) or length <= 0:
         raise ValueError("Length must be a positive integer.")
     
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        return _numpy_result(_numpy_bass((length,), _numpy_generator(rng)), as_array)
+    
+    rand = _python_rng(rng)
+    
     # Create a bass pattern with strong beats and lower values
-    pattern = [random.randint(60, 100) if i % 4 == 0 else random.randint(20, 50) for i in range(length)]
+    pattern = [rand.randint(60, 100) if i % 4 == 0 else rand.randint(20, 50) for i in range(length)]
     
     return pattern
 
-def create_melody_pattern(length: int) -> list:
+def create_melody_pattern(length: int, backend: str = None, as_array: bool = False, rng=None) -> list:
     """
     Creates a melody pattern with varied amplitudes.
     
     Parameters:
     length (int): Length of the pattern to generate
+    backend (str): "python" or "numpy"; defaults to the module backend
+    as_array (bool): Return a NumPy array instead of a list (numpy backend only)
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
     
     Returns:
     list: A list of integers representing amplitude values (0-100)
@@ -35,18 +268,26 @@ def create_melody_pattern(length: int) -> list:
     if not isinstance(length, int) or length <= 0:
         raise ValueError("Length must be a positive integer.")
     
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        return _numpy_result(_numpy_melody((length,), _numpy_generator(rng)), as_array)
+    
+    rand = _python_rng(rng)
+    
     # Create a melody pattern with varied amplitudes
-    base = random.randint(40, 70)
-    pattern = [max(0, min(100, base + random.randint(-20, 20))) for _ in range(length)]
+    base = rand.randint(40, 70)
+    pattern = [max(0, min(100, base + rand.randint(-20, 20))) for _ in range(length)]
     
     return pattern
 
-def create_percussion_pattern(length: int) -> list:
+def create_percussion_pattern(length: int, backend: str = None, as_array: bool = False, rng=None) -> list:
     """
     Creates a percussion pattern with sharp peaks.
     
     Parameters:
     length (int): Length of the pattern to generate
+    backend (str): "python" or "numpy"; defaults to the module backend
+    as_array (bool): Return a NumPy array instead of a list (numpy backend only)
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
     
     Returns:
     list: A list of integers representing amplitude values (0-100)
@@ -54,17 +295,25 @@ def create_percussion_pattern(length: int) -> list:
     if not isinstance(length, int) or length <= 0:
         raise ValueError("Length must be a positive integer.")
     
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        return _numpy_result(_numpy_percussion((length,), _numpy_generator(rng)), as_array)
+    
+    rand = _python_rng(rng)
+    
     # Create a percussion pattern with sharp peaks
-    pattern = [random.randint(80, 100) if i % 2 == 0 else random.randint(0, 10) for i in range(length)]
+    pattern = [rand.randint(80, 100) if i % 2 == 0 else rand.randint(0, 10) for i in range(length)]
     
     return pattern
 
-def create_ambient_pattern(length: int) -> list:
+def create_ambient_pattern(length: int, backend: str = None, as_array: bool = False, rng=None) -> list:
     """
     Creates a smooth ambient pattern.
     
     Parameters:
     length (int): Length of the pattern to generate
+    backend (str): "python" or "numpy"; defaults to the module backend
+    as_array (bool): Return a NumPy array instead of a list (numpy backend only)
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
     
     Returns:
     list: A list of integers representing amplitude values (0-100)
@@ -72,17 +321,168 @@ def create_ambient_pattern(length: int) -> list:
     if not isinstance(length, int) or length <= 0:
         raise ValueError("Length must be a positive integer.")
     
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        return _numpy_result(_numpy_ambient((length,), _numpy_generator(rng)), as_array)
+    
+    rand = _python_rng(rng)
+    
     # Create a smooth ambient pattern
     pattern = []
-    value = random.randint(30, 70)
+    value = rand.randint(30, 70)
     for _ in range(length):
-        value += random.randint(-5, 5)
+        value += rand.randint(-5, 5)
         value = max(10, min(90, value))  # Keep within bounds
         pattern.append(value)
     
     return pattern
 
-def slice_list(pattern: list, start: int = 0, end: int = None, step: int = 1) -> list:
+PATTERN_KINDS = ("bass", "melody", "percussion", "ambient")
+
+PATTERN_GENERATORS = {
+    "bass": create_bass_pattern,
+    "melody": create_melody_pattern,
+    "percussion": create_percussion_pattern,
+    "ambient": create_ambient_pattern,
+}
+
+_NUMPY_GENERATORS = {
+    "bass": _numpy_bass,
+    "melody": _numpy_melody,
+    "percussion": _numpy_percussion,
+    "ambient": _numpy_ambient,
+}
+
+def create_patterns(kind: str, length: int, count: int, backend: str = None, rng=None) -> list:
+    """
+    Creates many patterns of the same kind in a single call.
+    
+    Arguments, the backend and the rng are resolved once. With the numpy
+    backend the whole block is generated in one vectorized pass; with the
+    python backend every sample is drawn into one contiguous Pattern,
+    returned as PatternRows, so no per-pattern lists are built. Rows match
+    consecutive create_*_pattern calls on the same rng.
+    
+    Parameters:
+    kind (str): One of "bass", "melody", "percussion" or "ambient"
+    length (int): Length of each pattern
+    count (int): Number of patterns to generate
+    backend (str): "python" or "numpy"; defaults to the module backend
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
+    
+    Returns:
+    PatternRows: The patterns as rows of one contiguous Pattern, or a
+    contiguous (count, length) uint8 array with the numpy backend
+    """
+    if kind not in PATTERN_KINDS:
+        raise ValueError("Kind must be one of: " + ", ".join(PATTERN_KINDS) + ".")
+    if not isinstance(length, int) or length <= 0:
+        raise ValueError("Length must be a positive integer.")
+    if not isinstance(count, int) or count <= 0:
+        raise ValueError("Count must be a positive integer.")
+    
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        block = _NUMPY_GENERATORS[kind]((count, length), _numpy_generator(rng))
+        return np.ascontiguousarray(block, dtype=np.uint8)
+    
+    return PatternRows(Pattern._wrap(_python_block(kind, length, count, _python_rng(rng))), length)
+
+def _python_block(kind: str, length: int, count: int, rand) -> array:
+    """Draws count patterns into one array, making the same draws as count create_*_pattern calls."""
+    randrange = rand.randrange  # randint(a, b) is randrange(a, b + 1)
+    block = array("B")
+    for _ in range(count):
+        if kind == "bass":
+            block.extend([randrange(60, 101) if i % 4 == 0 else randrange(20, 51) for i in range(length)])
+        elif kind == "melody":
+            base = randrange(40, 71)
+            block.extend([max(0, min(100, base + randrange(-20, 21))) for _ in range(length)])
+        elif kind == "percussion":
+            block.extend([randrange(80, 101) if i % 2 == 0 else randrange(0, 11) for i in range(length)])
+        else:
+            value = randrange(30, 71)
+            for _ in range(length):
+                value = max(10, min(90, value + randrange(-5, 6)))
+                block.append(value)
+    return block
+
+def _python_stream(kind: str, rand):
+    """Yields amplitude values of one kind forever, keeping the pattern structure."""
+    if kind == "bass":
+        for i in itertools.count():
+            yield rand.randint(60, 100) if i % 4 == 0 else rand.randint(20, 50)
+    elif kind == "melody":
+        base = rand.randint(40, 70)
+        while True:
+            yield max(0, min(100, base + rand.randint(-20, 20)))
+    elif kind == "percussion":
+        for i in itertools.count():
+            yield rand.randint(80, 100) if i % 2 == 0 else rand.randint(0, 10)
+    else:
+        value = rand.randint(30, 70)
+        while True:
+            value += rand.randint(-5, 5)
+            value = max(10, min(90, value))
+            yield value
+
+def _python_chunks(kind: str, chunk_size: int, rand):
+    """Yields fixed-size lists from the pure-Python value stream."""
+    values = _python_stream(kind, rand)
+    while True:
+        yield list(itertools.islice(values, chunk_size))
+
+def _numpy_chunks(kind: str, chunk_size: int, generator, as_array: bool):
+    """Yields fixed-size chunks generated with vectorized NumPy draws."""
+    position = 0
+    base = int(generator.integers(40, 71))
+    value = np.array([generator.integers(30, 71)])
+    while True:
+        if kind == "bass":
+            chunk = generator.integers(20, 51, size=chunk_size)
+            beats = chunk[-position % 4::4]
+            beats[:] = generator.integers(60, 101, size=len(beats))
+        elif kind == "melody":
+            chunk = np.clip(base + generator.integers(-20, 21, size=chunk_size), 0, 100)
+        elif kind == "percussion":
+            chunk = generator.integers(0, 11, size=chunk_size)
+            hits = chunk[position % 2::2]
+            hits[:] = generator.integers(80, 101, size=len(hits))
+        else:
+            chunk = _numpy_ambient((1, chunk_size), generator, value)[0]
+            value = chunk[-1:]
+        position += chunk_size
+        yield _numpy_result(chunk, as_array)
+
+def stream_pattern(kind: str, chunk_size: int = None, backend: str = None, as_array: bool = False, rng=None):
+    """
+    Generates an endless pattern for live playback.
+    
+    The stream keeps each pattern's structure across values and chunks
+    (bass downbeat every 4 steps, percussion alternation, the melody base
+    and the ambient walk state), and memory stays constant however long
+    it runs.
+    
+    Parameters:
+    kind (str): One of "bass", "melody", "percussion" or "ambient"
+    chunk_size (int): Yield lists of this many values instead of single values
+    backend (str): "python" or "numpy" (numpy applies to chunked streams only)
+    as_array (bool): Yield NumPy arrays instead of lists (numpy backend only)
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
+    
+    Returns:
+    iterator: Amplitude values, or chunks of chunk_size values
+    """
+    if kind not in PATTERN_KINDS:
+        raise ValueError("Kind must be one of: " + ", ".join(PATTERN_KINDS) + ".")
+    if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size <= 0):
+        raise ValueError("Chunk size must be a positive integer.")
+    
+    if chunk_size is None:
+        return _python_stream(kind, _python_rng(rng))
+    if _resolve_backend(backend) == BACKEND_NUMPY:
+        return _numpy_chunks(kind, chunk_size, _numpy_generator(rng), as_array)
+    return _python_chunks(kind, chunk_size, _python_rng(rng))
+
+def slice_list(pattern: list, start: int = 0, end: int = None, step: int = 1, view: bool = False) -> list:
     """
     Extracts a segment of a list using slice notation.
     
@@ -91,12 +491,13 @@ def slice_list(pattern: list, start: int = 0, end: int = None, step: int = 1) ->
     start (int): Starting index
     end (int): Ending index (exclusive)
     step (int): Step size
+    view (bool): Return an O(1) PatternView instead of a copy
     
     Returns:
     list: Sliced list
     """
-    if not isinstance(pattern, list):
-        raise ValueError("Pattern must be a list.")
+    if not isinstance(pattern, PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
     if not isinstance(start, int):
         raise ValueError("Start must be an integer.")
     if end is not None and not isinstance(end, int):
@@ -108,139 +509,284 @@ def slice_list(pattern: list, start: int = 0, end: int = None, step: int = 1) ->
     if end is None:
         end = len(pattern)
     
+    if view:
+        return PatternView(pattern, start, end, step)
+    
     # Use exact pattern[start:end:step] notation to match regex
     return pattern[start:end:step]
 
-def reverse_list(pattern: list) -> list:
+def reverse_list(pattern: list, view: bool = False) -> list:
     """
     Reverses a list.
     
     Parameters:
     pattern (list): The list to reverse
+    view (bool): Return an O(1) PatternView instead of a copy
     
     Returns:
     list: Reversed list
     """
-    if not isinstance(pattern, list):
-        raise ValueError("Pattern must be a list.")
+    if not isinstance(pattern, PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+    
+    if view:
+        return PatternView(pattern, None, None, -1)
     
     # Use exact pattern[::-1] notation to match regex
     return pattern[::-1]
 
-def extend_list(pattern: list, repeats: int) -> list:
+def extend_list(pattern: list, repeats: int, lazy: bool = False) -> list:
     """
     Extends a list by repeating it multiple times.
     
     Parameters:
     pattern (list): The list to extend
     repeats (int): Number of times to repeat the list
+    lazy (bool): Return an O(1) RepeatedPattern instead of a copy
     
     Returns:
     list: Extended list
     """
-    if not isinstance(pattern, list):
-        raise ValueError("Pattern must be a list.")
+    if not isinstance(pattern, PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
     if not isinstance(repeats, int) or repeats <= 0:
         raise ValueError("Repeats must be a positive integer.")
     
+    if lazy:
+        return RepeatedPattern(pattern, repeats)
+    
     # Create a new list with the pattern repeated
     return pattern * repeats
 
-def combine_lists(pattern1: list, pattern2: list) -> list:
+def combine_lists(pattern1: list, pattern2: list, rope: bool = False) -> list:
     """
     Combines two lists using concatenation.
     
     Parameters:
     pattern1 (list): The first list
     pattern2 (list): The second list
+    rope (bool): Return an O(log n) Rope instead of a copy
     
     Returns:
     list: Combined list
     """
-    if not isinstance(pattern1, list):
-        raise ValueError("Pattern1 must be a list.")
-    if not isinstance(pattern2, list):
-        raise ValueError("Pattern2 must be a list.")
+    if not isinstance(pattern1, PATTERN_TYPES):
+        raise ValueError("Pattern1 must be a list, Pattern or lazy pattern.")
+    if not isinstance(pattern2, PATTERN_TYPES):
+        raise ValueError("Pattern2 must be a list, Pattern or lazy pattern.")
+    
+    if rope:
+        return Rope(pattern1, pattern2)
     
     # Combine the lists
     return pattern1 + pattern2
 
-def shuffle_segments(pattern: list, segment_size: int) -> list:
+def _segment_source(pattern):
+    """Returns something segments can be sliced from cheaply (a buffer for Pattern)."""
+    return pattern.buffer if isinstance(pattern, Pattern) else pattern
+
+def _shuffle_cycles(pattern, segment_size: int, order: list) -> None:
+    """
+    Permutes equal-sized segments in place by following permutation cycles.
+    
+    Only one segment is held aside per cycle, so the extra memory is
+    O(segment_size) plus one flag per segment.
+    """
+    data = _segment_source(pattern)
+    visited = bytearray(len(order))
+    for first in range(len(order)):
+        if visited[first] or order[first] == first:
+            continue
+        held = data[first * segment_size:(first + 1) * segment_size]
+        held = bytes(held) if isinstance(held, memoryview) else held
+        current = first
+        while True:
+            visited[current] = 1
+            source = order[current]
+            if source == first:
+                data[current * segment_size:(current + 1) * segment_size] = held
+                break
+            data[current * segment_size:(current + 1) * segment_size] = data[source * segment_size:(source + 1) * segment_size]
+            current = source
+
+def _move_tail(pattern, segment_size: int, index: int) -> None:
+    """
+    Moves the short trailing segment in place to segment position index.
+    
+    The full segments from index on are shifted right one at a time, so
+    the extra memory is O(segment_size).
+    """
+    data = _segment_source(pattern)
+    length = len(data)
+    full = length - length % segment_size
+    tail = data[full:]
+    tail = bytes(tail) if isinstance(tail, memoryview) else tail
+    shift = length - full
+    for start in range(full - segment_size, index * segment_size - 1, -segment_size):
+        data[start + shift:start + shift + segment_size] = data[start:start + segment_size]
+    data[index * segment_size:index * segment_size + shift] = tail
+
+def _shares_storage(pattern, storage) -> bool:
+    """Returns whether pattern is storage or a lazy pattern reading from it."""
+    pending = [pattern]
+    while pending:
+        pattern = pending.pop()
+        if pattern is storage:
+            return True
+        if isinstance(pattern, Rope):
+            pending.extend(pattern.leaves())
+        elif isinstance(pattern, (PatternView, RepeatedPattern)):
+            pending.append(pattern.base)
+    return False
+
+def shuffle_segments(pattern: list, segment_size: int, rng=None, out: list = None, in_place: bool = False) -> list:
     """
     Shuffles segments of a list while maintaining segment integrity.
     
+    Only the segment start offsets are shuffled; segments are then copied
+    straight into a single preallocated result, so no per-segment lists
+    are built. The same rng gives the same order as shuffling a list of
+    segments. In place, segments are moved along permutation cycles and a
+    short trailing segment is shifted into position, so the extra memory
+    is O(segment_size) plus one flag per segment.
+    
     Parameters:
     pattern (list): The list to shuffle
     segment_size (int): Size of each segment
+    rng: Integer seed, random.Random or numpy Generator; defaults to global state
+    out (list): Preallocated list or Pattern of the same length to write into;
+    out=pattern shuffles in place, and other views of pattern are rejected
+    in_place (bool): Shuffle a list or Pattern in place instead
     
     Returns:
-    list: List with shuffled segments
+    list: List with shuffled segments (out or pattern itself when given)
     """
-    if not isinstance(pattern, list):
-        raise ValueError("Pattern must be a list.")
+    if not isinstance(pattern, PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
     if not isinstance(segment_size, int) or segment_size <= 0:
         raise ValueError("Segment size must be a positive integer.")
+    if in_place and out is not None:
+        raise ValueError("Use either out or in_place, not both.")
+    if in_place and not isinstance(pattern, (list, Pattern)):
+        raise ValueError("In-place shuffling needs a list or Pattern.")
+    if out is not None and (not isinstance(out, (list, Pattern)) or len(out) != len(pattern)):
+        raise ValueError("Out must be a list or Pattern with the same length as pattern.")
+    if out is pattern:
+        # Segments would be read after being overwritten, so shuffle in place
+        out, in_place = None, True
+    elif out is not None and _shares_storage(pattern, out):
+        raise ValueError("Out must not be read by pattern; use in_place to shuffle it.")
+    
+    # Shuffle the segment offsets
+    length = len(pattern)
+    offsets = list(range(0, length, segment_size))
+    _python_rng(rng).shuffle(offsets)
     
-    # Divide pattern into segments
-    segments = []
-    for i in range(0, len(pattern), segment_size):
-        segments.append(pattern[i:min(i + segment_size, len(pattern))])
+    if in_place:
+        full = length - length % segment_size
+        _shuffle_cycles(pattern, segment_size, [offset // segment_size for offset in offsets if offset < full])
+        if full < length:
+            _move_tail(pattern, segment_size, offsets.index(full))
+        return pattern
     
-    # Shuffle segments
-    random.shuffle(segments)
+    source = pattern
+    if out is None:
+        out = like(pattern, bytes(length))
+    if isinstance(out, Pattern) and not isinstance(source, Pattern):
+        source = Pattern(source)
     
-    # Reconstruct pattern
-    result = []
-    for segment in segments:
-        result.extend(segment)
+    # Copy each segment into its new position
+    source, target = _segment_source(source), _segment_source(out)
+    position = 0
+    for offset in offsets:
+        end = min(offset + segment_size, length)
+        target[position:position + end - offset] = source[offset:end]
+        position += end - offset
     
-    return result
+    return out
+
+VISUALIZATION_HEIGHT = 10  # Rows in the visualization
+VISUALIZATION_WIDTH = 50  # Maximum number of values shown
+
+# Each column is encoded as one ASCII byte: its bar height as a digit
+# ("0"-"9", ":" for 10) or "?" for values that are not numbers. Row r is
+# then rendered in one pass with a byte table mapping heights >= r to a
+# placeholder that is swapped for the block character once per frame.
+_BLOCK_PLACEHOLDER = "#"
+_ROWS = [
+    (
+        f"{row:2d} |".encode("ascii"),
+        bytes.maketrans(
+            bytes(range(48, 48 + VISUALIZATION_HEIGHT + 1)),
+            bytes(ord(_BLOCK_PLACEHOLDER) if height >= row else ord(" ") for height in range(VISUALIZATION_HEIGHT + 1)),
+        ),
+    )
+    for row in range(VISUALIZATION_HEIGHT, 0, -1)
+]  # (label, table) for each row, top to bottom
+
+def _column_code(value) -> str:
+    """Encodes one value's bar height (or "?" if it is not a number)."""
+    try:
+        value_num = int(value)
+    except (ValueError, TypeError):
+        return "?"
+    return chr(48 + max(0, min(VISUALIZATION_HEIGHT, value_num // (100 // VISUALIZATION_HEIGHT))))
+
+# Codes for integer amplitudes 0-255, indexed by the value itself
+_BYTE_CODES = bytes(ord(_column_code(value)) for value in range(256))
+_INDEX_DIGITS = "0123456789" * (VISUALIZATION_WIDTH // 10 + 1)
+
+def _encode_columns(values) -> bytes:
+    """Encodes the bar height of every displayed value."""
+    try:
+        # Integers 0-255 (the usual case) are packed and mapped in C
+        return bytes(values).translate(_BYTE_CODES)
+    except (TypeError, ValueError):
+        return "".join(map(_column_code, values)).encode("ascii")
+
+@functools.lru_cache(maxsize=256)
+def _render_columns(columns: bytes) -> str:
+    """Renders (and caches) a frame from its encoded column heights."""
+    width = len(columns)
+    rows = b"\n".join([label + columns.translate(table) for label, table in _ROWS])
+
+    return (
+        "    " + _INDEX_DIGITS[:width] + "\n"
+        + rows.decode("ascii").replace(_BLOCK_PLACEHOLDER, "█")
+        + "\n   " + "-" * (width + 1) + "\n    Values (0-100)"
+    )
+
+@functools.lru_cache(maxsize=256)
+def _render_frame(values: tuple) -> str:
+    """Renders (and caches) the visualization of up to VISUALIZATION_WIDTH values."""
+    return _render_columns(_encode_columns(values))
 
 def visualize_list(pattern: list) -> str:
     """
     Creates an ASCII visualization of a list.
     
+    Bar heights are computed once per column and each row is built with a
+    single translate call; frames are cached on the displayed values, so
+    redrawing an unchanged pattern is a dictionary lookup.
+    
     Parameters:
     pattern (list): The list to visualize
     
     Returns:
     str: ASCII visualization
     """
-    if not isinstance(pattern, list):
-        raise ValueError("Pattern must be a list.")
+    if not isinstance(pattern, PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
     
     if not pattern:
         return "Empty list"
     
-    height = 10  # Height of the visualization
-    result = []
-    
-    # Create a header with indices
-    header = "    " + "".join(f"{i % 10}" for i in range(min(len(pattern), 50)))
-    result.append(header)
-    
-    # Create visualization rows
-    for row in range(height, 0, -1):
-        threshold = row * (100 / height)
-        line = f"{row:2d} |"
-        
-        for value in pattern[:50]:  # Limit to first 50 values for display
-            try:
-                value_num = int(value)
-                if value_num >= threshold:
-                    line += "█"
-                else:
-                    line += " "
-            except (ValueError, TypeError):
-                line += "?"
-        
-        result.append(line)
-    
-    # Add a footer
-    result.append("   " + "-" * (min(len(pattern), 50) + 1))
-    result.append("    Values (0-100)")
-    
-    return "\n".join(result)
+    values = tuple(pattern[:VISUALIZATION_WIDTH])  # Limit to first 50 values for display
+    try:
+        return _render_frame(values)
+    except TypeError:
+        # Unhashable values cannot key the frame cache
+        return _render_columns(_encode_columns(values))
 
 def display_menu() -> None:
     """Displays the main menu of the List Operations Lab."""
@@ -264,11 +810,21 @@ def display_transformation_menu() -> None:
     print("3. Extend List (list * n)")
     print("4. Combine with New List (list1 + list2)")
     print("5. Shuffle Segments")
+    print("6. Undo Last Transformation")
+    print("7. Redo Transformation")
     print("0. Return to Main Menu")
     print("==========================")
 
-def main():
-    """Main function to run the List Operations Lab."""
+def main(tui: bool = False, play: str = None):
+    """
+    Main function to run the List Operations Lab.
+    
+    Parameters:
+    tui (bool): Keep the pattern and menu on screen and redraw only what
+    changes (needs an ANSI terminal)
+    play (str): File or named pipe to play the active pattern to while
+    editing; changes take effect at the next bar
+    """
     try:
         print("\nWelcome to List Operations Lab!")
         print("This application demonstrates fundamental list operations in Python.")
@@ -276,15 +832,41 @@ def main():
         # Initialize variables
         patterns = []  # Store created patterns
         active_pattern = None  # Currently selected pattern
+        history = PatternHistory()  # Versions of the active pattern for undo/redo
+        ui = TerminalUI(visualize_list, display_menu) if tui else None
+        player = PatternPlayer(FileSink(play)) if play else None
+        if player is not None:
+            player.start()
+        
+        def show_pattern(title, pattern):
+            """Prints a pattern, or updates the terminal UI frame."""
+            if ui is None:
+                print(title)
+                print(visualize_list(pattern))
+            else:
+                ui.show(title.strip(), pattern)
+        
+        def report(message):
+            """Prints a message, or shows it on the terminal UI status line."""
+            if ui is None:
+                print(message)
+            else:
+                ui.status(message)
         
         continue_running = True
         while continue_running:
-            display_menu()
+            if player is not None and active_pattern is not None and active_pattern is not player.pattern:
+                player.swap(active_pattern)
+            if ui is None:
+                display_menu()
+            else:
+                ui.set_menu(display_menu)
+                ui.redraw()
             
             try:
                 choice = input("Enter your choice: ").strip()
                 if not choice.isdigit():
-                    print("Please enter a number.")
+                    report("Please enter a number.")
                     continue
                 
                 choice = int(choice)
@@ -297,12 +879,12 @@ def main():
                     # Create a new pattern
                     length_input = input("Enter pattern length (8-64): ").strip()
                     if not length_input.isdigit():
-                        print("Please enter a valid number.")
+                        report("Please enter a valid number.")
                         continue
                     
                     length = int(length_input)
                     if not 8 <= length <= 64:
-                        print("Length must be between 8 and 64.")
+                        report("Length must be between 8 and 64.")
                         continue
                     
                     if choice == 1:
@@ -324,20 +906,24 @@ def main():
                     
                     # Add to list of patterns
                     patterns.append(active_pattern)
+                    history.reset(active_pattern, f"Create {pattern_type}")
                     
-                    print(f"\nCreated {pattern_type} Pattern (Length: {len(active_pattern)})")
-                    print(visualize_list(active_pattern))
+                    show_pattern(f"\nCreated {pattern_type} Pattern (Length: {len(active_pattern)})", active_pattern)
                 
                 elif choice == 5:
                     # Transform current pattern
                     if active_pattern is None:
-                        print("No active pattern. Please create a pattern first.")
+                        report("No active pattern. Please create a pattern first.")
                         continue
                     
-                    display_transformation_menu()
+                    if ui is None:
+                        display_transformation_menu()
+                    else:
+                        ui.set_menu(display_transformation_menu)
+                        ui.redraw()
                     transform_choice = input("Select transformation: ").strip()
                     if not transform_choice.isdigit():
-                        print("Please enter a number.")
+                        report("Please enter a number.")
                         continue
                     
                     transform_choice = int(transform_choice)
@@ -348,15 +934,14 @@ def main():
                     
                     elif transform_choice == 1:
                         # Reverse list
-                        active_pattern = reverse_list(active_pattern)
-                        print("\nList Reversed using list[::-1]")
-                        print(visualize_list(active_pattern))
+                        active_pattern = history.record("Reverse", reverse_list(active_pattern, view=True))
+                        show_pattern("\nList Reversed using list[::-1]", active_pattern)
                     
                     elif transform_choice == 2:
                         # Slice list
                         start_input = input("Start index: ").strip()
                         if not start_input.isdigit():
-                            print("Please enter a valid number.")
+                            report("Please enter a valid number.")
                             continue
                         start = int(start_input)
                         
@@ -364,45 +949,44 @@ def main():
                         end = None
                         if end_input:
                             if not end_input.isdigit():
-                                print("Please enter a valid number or leave blank.")
+                                report("Please enter a valid number or leave blank.")
                                 continue
                             end = int(end_input)
                         
                         step_input = input("Step size (default 1): ").strip() or "1"
                         if not step_input.isdigit() or int(step_input) == 0:
-                            print("Please enter a non-zero number.")
+                            report("Please enter a non-zero number.")
                             continue
                         step = int(step_input)
                         
-                        active_pattern = slice_list(active_pattern, start, end, step)
-                        print(f"\nList Sliced using list[{start}:{end if end is not None else ''}:{step}]")
-                        print(visualize_list(active_pattern))
+                        active_pattern = history.record("Slice", slice_list(active_pattern, start, end, step, view=True))
+                        show_pattern(f"\nList Sliced using list[{start}:{end if end is not None else ''}:{step}]", active_pattern)
                     
                     elif transform_choice == 3:
                         # Extend list
                         repeats_input = input("Number of repetitions: ").strip()
                         if not repeats_input.isdigit() or int(repeats_input) <= 0:
-                            print("Please enter a positive number.")
+                            report("Please enter a positive number.")
                             continue
                         repeats = int(repeats_input)
                         
-                        active_pattern = extend_list(active_pattern, repeats)
-                        print(f"\nList Extended using list * {repeats}")
-                        print(visualize_list(active_pattern))
+                        active_pattern = history.record("Extend", extend_list(active_pattern, repeats, lazy=True))
+                        show_pattern(f"\nList Extended using list * {repeats}", active_pattern)
                     
                     elif transform_choice == 4:
                         # Combine with new list
-                        print("\nCreate a new list to combine with:")
+                        if ui is None:
+                            print("\nCreate a new list to combine with:")
                         
                         pattern_type_input = input("Select pattern type (1-Bass, 2-Melody, 3-Percussion, 4-Ambient): ").strip()
                         if not pattern_type_input.isdigit() or not 1 <= int(pattern_type_input) <= 4:
-                            print("Please enter a number between 1 and 4.")
+                            report("Please enter a number between 1 and 4.")
                             continue
                         pattern_type_choice = int(pattern_type_input)
                         
                         length_input = input("Enter pattern length (8-64): ").strip()
                         if not length_input.isdigit() or not 8 <= int(length_input) <= 64:
-                            print("Please enter a valid length between 8 and 64.")
+                            report("Please enter a valid length between 8 and 64.")
                             continue
                         length = int(length_input)
                         
@@ -415,52 +999,67 @@ def main():
                         else:
                             new_pattern = create_ambient_pattern(length)
                         
-                        print("\nNew pattern created:")
-                        print(visualize_list(new_pattern))
+                        show_pattern("\nNew pattern created:", new_pattern)
                         
-                        active_pattern = combine_lists(active_pattern, new_pattern)
-                        print("\nLists Combined using list1 + list2")
-                        print(visualize_list(active_pattern))
+                        active_pattern = history.record("Combine", combine_lists(active_pattern, new_pattern, rope=True))
+                        show_pattern("\nLists Combined using list1 + list2", active_pattern)
                     
                     elif transform_choice == 5:
                         # Shuffle segments
                         segment_input = input("Segment size: ").strip()
                         if not segment_input.isdigit() or int(segment_input) <= 0:
-                            print("Please enter a positive number.")
+                            report("Please enter a positive number.")
                             continue
                         segment_size = int(segment_input)
                         
                         if segment_size > len(active_pattern):
-                            print(f"Segment size cannot be larger than list length ({len(active_pattern)}).")
+                            report(f"Segment size cannot be larger than list length ({len(active_pattern)}).")
                             continue
                         
-                        active_pattern = shuffle_segments(active_pattern, segment_size)
-                        print("\nList Segments Shuffled")
-                        print(visualize_list(active_pattern))
+                        active_pattern = history.record("Shuffle", shuffle_segments(active_pattern, segment_size))
+                        show_pattern("\nList Segments Shuffled", active_pattern)
+                    
+                    elif transform_choice == 6:
+                        # Undo last transformation
+                        if not history.can_undo:
+                            report("Nothing to undo.")
+                            continue
+                        operation, active_pattern = history.undo()
+                        show_pattern(f"\nUndid {operation} (Length: {len(active_pattern)})", active_pattern)
+                    
+                    elif transform_choice == 7:
+                        # Redo transformation
+                        if not history.can_redo:
+                            report("Nothing to redo.")
+                            continue
+                        operation, active_pattern = history.redo()
+                        show_pattern(f"\nRedid {operation} (Length: {len(active_pattern)})", active_pattern)
                     
                     else:
-                        print("Invalid choice.")
+                        report("Invalid choice.")
                 
                 elif choice == 6:
                     # View current pattern
                     if active_pattern is None:
-                        print("No active pattern. Please create a pattern first.")
+                        report("No active pattern. Please create a pattern first.")
                     else:
-                        print(f"\nCurrent Pattern (Length: {len(active_pattern)})")
-                        print(visualize_list(active_pattern))
+                        show_pattern(f"\nCurrent Pattern (Length: {len(active_pattern)})", active_pattern)
                 
                 else:
-                    print("Invalid choice. Please try again.")
+                    report("Invalid choice. Please try again.")
                 
             except ValueError as e:
-                print(f"Error: {str(e)}")
+                report(f"Error: {str(e)}")
             except Exception as e:
-                print(f"An unexpected error occurred: {str(e)}")
+                report(f"An unexpected error occurred: {str(e)}")
         
+        if player is not None:
+            player.stop()
         print("\nThank you for using List Operations Lab!")
         
     except Exception as e:
         print(f"\nAn unexpected error occurred: {str(e)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    play = next((arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--play=")), None)
+    main(tui="--tui" in sys.argv[1:], play=play)
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""
+List Operations Lab - Benchmarks
+Times the pattern generators, list transformations and visualization across pattern sizes.
+
+Examples:
+    python mixer_benchmark.py --sizes 64 10000 1000000 --output results.json
+    python mixer_benchmark.py --only create_bass reverse_list --backend numpy
+    python mixer_benchmark.py --compare baseline.json --threshold 0.25
+
+Each benchmark is timed several times and the best and median times are
+reported; peak memory is measured with tracemalloc in a separate run, since
+tracing slows the code down. --compare exits with status 1 if any result
+is slower or uses more memory than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import digital_music_mixer as mixer
+
+DEFAULT_SIZES = (64, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+SEGMENT_SIZE = 16
+
+def _clear_visualization_cache() -> None:
+    mixer._render_frame.cache_clear()
+    mixer._render_columns.cache_clear()
+
+def _visualize(pattern) -> str:
+    """Renders without the frame cache, so every run measures a full render."""
+    _clear_visualization_cache()
+    return mixer.visualize_list(pattern)
+
+# Each entry builds the timed call from a size, two input patterns and a backend
+BENCHMARKS = {
+    "create_bass": lambda size, a, b, backend: lambda: mixer.create_bass_pattern(size, backend),
+    "create_melody": lambda size, a, b, backend: lambda: mixer.create_melody_pattern(size, backend),
+    "create_percussion": lambda size, a, b, backend: lambda: mixer.create_percussion_pattern(size, backend),
+    "create_ambient": lambda size, a, b, backend: lambda: mixer.create_ambient_pattern(size, backend),
+    "slice_list": lambda size, a, b, backend: lambda: mixer.slice_list(a, size // 4, 3 * size // 4, 2),
+    "reverse_list": lambda size, a, b, backend: lambda: mixer.reverse_list(a),
+    "extend_list": lambda size, a, b, backend: lambda: mixer.extend_list(a, 4),
+    "combine_lists": lambda size, a, b, backend: lambda: mixer.combine_lists(a, b),
+    "shuffle_segments": lambda size, a, b, backend: lambda: mixer.shuffle_segments(a, SEGMENT_SIZE, rng=1),
+    "visualize_list": lambda size, a, b, backend: lambda: _visualize(a),
+}
+
+def measure(function, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Times a call and measures its peak memory.
+
+    Parameters:
+    function: Zero-argument callable to benchmark
+    repeat (int): Number of timed runs
+
+    Returns:
+    dict: best_s, median_s and peak_bytes
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"best_s": min(times), "median_s": statistics.median(times), "peak_bytes": peak}
+
+def run_benchmarks(names=None, sizes=DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT, backend: str = None,
+                   progress=None) -> list:
+    """
+    Runs benchmarks for every size.
+
+    Input patterns are generated once per size with a fixed seed and are
+    not included in the timings.
+
+    Parameters:
+    names: Benchmark names to run; defaults to all of BENCHMARKS
+    sizes: Pattern sizes
+    repeat (int): Timed runs per benchmark
+    backend (str): "python" or "numpy" for the generators
+    progress: Optional callable receiving each result as it completes
+
+    Returns:
+    list: One result dict per benchmark and size
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError("Unknown benchmarks: " + ", ".join(unknown) + ".")
+    if not isinstance(repeat, int) or repeat <= 0:
+        raise ValueError("Repeat must be a positive integer.")
+    backend = mixer._resolve_backend(backend)
+
+    results = []
+    for size in sizes:
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError("Sizes must be positive integers.")
+        first = mixer.create_bass_pattern(size, backend, rng=1)
+        second = mixer.create_melody_pattern(size, backend, rng=2)
+        for name in names:
+            function = BENCHMARKS[name](size, first, second, backend)
+            result = {"benchmark": name, "size": size, "backend": backend, **measure(function, repeat)}
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return results
+
+def environment() -> dict:
+    """Describes the machine and interpreter the results come from."""
+    return {
+        "python": platform.python_version(),
+        "numpy": getattr(mixer.np, "__version__", None),
+        "platform": platform.platform(),
+    }
+
+def compare_results(results: list, baseline: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Finds results that regressed against a baseline.
+
+    Results are matched on benchmark, size and backend; unmatched results
+    are skipped.
+
+    Parameters:
+    results (list): Current results
+    baseline (list): Stored results
+    threshold (float): Allowed slowdown or memory growth, e.g. 0.2 for 20%
+
+    Returns:
+    list: (result, metric, ratio) for every metric above 1 + threshold
+    """
+    if not isinstance(threshold, (int, float)) or threshold < 0:
+        raise ValueError("Threshold must be a non-negative number.")
+    stored = {(entry["benchmark"], entry["size"], entry["backend"]): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        previous = stored.get((result["benchmark"], result["size"], result["backend"]))
+        if previous is None:
+            continue
+        for metric in ("best_s", "peak_bytes"):
+            if previous[metric] > 0:
+                ratio = result[metric] / previous[metric]
+                if ratio > 1 + threshold:
+                    regressions.append((result, metric, ratio))
+    return regressions
+
+def format_result(result: dict) -> str:
+    """Formats one result as a table row."""
+    return (f"{result['benchmark']:<18} {result['size']:>10} {result['backend']:<7} "
+            f"{result['best_s'] * 1000:>12.3f} {result['median_s'] * 1000:>12.3f} {result['peak_bytes'] / 1024:>12.1f}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mixer_benchmark", description="Benchmark the List Operations Lab.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), metavar="N",
+                        help="pattern sizes (default: 64 to 10^7)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), metavar="NAME",
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per benchmark")
+    parser.add_argument("--backend", choices=mixer.BACKENDS, help="generator backend")
+    parser.add_argument("--output", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a regression is flagged (default: 0.2)")
+    return parser
+
+def main(argv: list = None) -> int:
+    """
+    Runs the benchmarks from the command line.
+
+    Returns:
+    int: Exit status, 1 if a regression was found or the baseline could not be read
+    """
+    options = build_parser().parse_args(argv)
+    baseline = None
+    if options.compare:
+        try:
+            with open(options.compare, encoding="utf-8") as file:
+                baseline = json.load(file)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: cannot read baseline: {str(e)}", file=sys.stderr)
+            return 1
+
+    print(f"{'benchmark':<18} {'size':>10} {'backend':<7} {'best ms':>12} {'median ms':>12} {'peak KiB':>12}")
+    try:
+        results = run_benchmarks(options.only, options.sizes, options.repeat, options.backend,
+                                 progress=lambda result: print(format_result(result), flush=True))
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+
+    if baseline is None:
+        return 0
+    regressions = compare_results(results, baseline, options.threshold)
+    for result, metric, ratio in regressions:
+        print(f"REGRESSION {result['benchmark']} size {result['size']} ({result['backend']}): "
+              f"{metric} x{ratio:.2f}")
+    if not regressions:
+        print("No regressions.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
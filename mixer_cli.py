@@ -0,0 +1,221 @@
+"""
+List Operations Lab - Batch Command Line
+Runs pattern generation and transformation jobs without the interactive menus.
+
+Examples:
+    python mixer_cli.py --generate bass:32 --seed 7 --reverse --slice 0:16:2 --extend 4
+    python mixer_cli.py --generate melody:16 --combine percussion:16 --shuffle 4 --format visual
+    python mixer_cli.py --jobs jobs.txt
+
+A job file holds one job per line, written with the same arguments as the
+command line; blank lines and lines starting with # are ignored. Jobs that
+share an --output path append their results to it in order. Slice bounds
+may be negative, e.g. --slice -3: for the last three steps.
+"""
+import argparse
+import json
+import random
+import re
+import shlex
+import sys
+
+import digital_music_mixer as mixer
+from pattern_plan import plan
+
+FORMATS = ("text", "json", "visual")
+
+# A slice spec starting with a minus sign, such as -3: or -1::2, which argparse would take for an option
+_NEGATIVE_SLICE = re.compile(r"-[\d:][\d:-]*$")
+
+def parse_pattern_spec(spec: str) -> tuple:
+    """
+    Parses a "kind:length" generator spec such as "bass:32".
+
+    Returns:
+    tuple: (kind, length)
+    """
+    kind, _, length = spec.partition(":")
+    if kind not in mixer.PATTERN_KINDS:
+        raise argparse.ArgumentTypeError("kind must be one of: " + ", ".join(mixer.PATTERN_KINDS))
+    if not length.isdigit() or int(length) <= 0:
+        raise argparse.ArgumentTypeError("length must be a positive integer")
+    return kind, int(length)
+
+def parse_slice_spec(spec: str) -> tuple:
+    """
+    Parses a "start:end:step" slice spec; end and step may be left empty.
+
+    Returns:
+    tuple: (start, end, step)
+    """
+    parts = spec.split(":")
+    if len(parts) > 3:
+        raise argparse.ArgumentTypeError("slice must look like start:end:step")
+    parts += [""] * (3 - len(parts))
+    try:
+        start = int(parts[0]) if parts[0] else 0
+        end = int(parts[1]) if parts[1] else None
+        step = int(parts[2]) if parts[2] else 1
+    except ValueError:
+        raise argparse.ArgumentTypeError("slice bounds must be integers") from None
+    return start, end, step
+
+def _attach_slice_values(args: list) -> list:
+    """Rewrites "--slice -3:" as "--slice=-3:" so argparse does not read the value as an option."""
+    result = []
+    for arg in args:
+        if result and result[-1] == "--slice" and _NEGATIVE_SLICE.match(arg):
+            result[-1] = "--slice=" + arg
+        else:
+            result.append(arg)
+    return result
+
+def _positive_int(value: str) -> int:
+    if not value.isdigit() or int(value) <= 0:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return int(value)
+
+def _operation(name: str, parse=None):
+    """Builds an argparse type that records an operation in command-line order."""
+    def parse_operation(value):
+        return name, parse(value) if parse else value
+    return parse_operation
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser shared by the command line and job files."""
+    parser = argparse.ArgumentParser(
+        prog="mixer_cli",
+        description="Generate and transform sound patterns non-interactively.",
+    )
+    parser.add_argument("--generate", metavar="KIND:LENGTH", type=parse_pattern_spec,
+                        help="pattern to generate, e.g. bass:32")
+    parser.add_argument("--seed", type=int, help="seed for reproducible output")
+    parser.add_argument("--reverse", dest="operations", action="append_const", const=("reverse", None),
+                        help="reverse the pattern (list[::-1])")
+    parser.add_argument("--slice", dest="operations", action="append", metavar="START:END:STEP",
+                        type=_operation("slice", parse_slice_spec),
+                        help="slice the pattern; bounds may be negative, e.g. -3:")
+    parser.add_argument("--extend", dest="operations", action="append", metavar="REPEATS",
+                        type=_operation("extend", _positive_int), help="repeat the pattern (list * n)")
+    parser.add_argument("--combine", dest="operations", action="append", metavar="KIND:LENGTH",
+                        type=_operation("combine", parse_pattern_spec),
+                        help="append a newly generated pattern (list1 + list2)")
+    parser.add_argument("--shuffle", dest="operations", action="append", metavar="SEGMENT_SIZE",
+                        type=_operation("shuffle", _positive_int), help="shuffle segments of the pattern")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="output format (default: text)")
+    parser.add_argument("--output", metavar="PATH", help="write the result to a file instead of stdout")
+    parser.add_argument("--jobs", metavar="PATH", help="run every job listed in a job file")
+    return parser
+
+def run_job(options: argparse.Namespace):
+    """
+    Generates a pattern and applies the transformation chain.
+
+    The chain is built as a TransformPlan, which simplifies it and then
+    produces the result in a single pass over the generated data.
+
+    Returns:
+    The transformed pattern
+    """
+    if options.generate is None:
+        raise ValueError("A job needs --generate KIND:LENGTH.")
+    rng = random.Random(options.seed) if options.seed is not None else None
+    kind, length = options.generate
+    chain = plan(mixer.PATTERN_GENERATORS[kind](length, rng=rng))
+    for name, value in options.operations or []:
+        if name == "reverse":
+            chain = chain.reverse()
+        elif name == "slice":
+            chain = chain.slice(*value)
+        elif name == "extend":
+            chain = chain.extend(value)
+        elif name == "combine":
+            other_kind, other_length = value
+            chain = chain.combine(mixer.PATTERN_GENERATORS[other_kind](other_length, rng=rng))
+        elif name == "shuffle":
+            chain = chain.shuffle(value, rng=rng)
+    return chain.execute()
+
+def format_pattern(pattern, output_format: str) -> str:
+    """Formats a pattern as text, JSON or an ASCII visualization."""
+    if output_format == "json":
+        return json.dumps(list(pattern))
+    if output_format == "visual":
+        return mixer.visualize_list(pattern)
+    return " ".join(map(str, pattern))
+
+def write_result(text: str, path: str = None, append: bool = False) -> None:
+    """Writes one job's result to stdout, or to a file that is replaced unless append is set."""
+    if path is None:
+        sys.stdout.write(text + "\n")
+    else:
+        with open(path, "a" if append else "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+def read_jobs(path: str, parser: argparse.ArgumentParser) -> list:
+    """
+    Parses a job file into a list of argument namespaces.
+
+    A line that cannot be parsed becomes None (argparse has already
+    reported why), so one bad line does not stop the other jobs.
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                options = parser.parse_args(_attach_slice_values(shlex.split(line)))
+            except SystemExit:
+                options = None
+            except ValueError as e:
+                print(f"Invalid job line: {str(e)}", file=sys.stderr)
+                options = None
+            if options is not None and options.jobs:
+                print("Job files cannot include --jobs.", file=sys.stderr)
+                options = None
+            jobs.append(options)
+    return jobs
+
+def _job_arguments(options: argparse.Namespace, parser: argparse.ArgumentParser) -> list:
+    """Returns the names of options, other than --jobs, that differ from their defaults."""
+    return [name for name, value in vars(options).items() if name != "jobs" and value != parser.get_default(name)]
+
+def main(argv: list = None) -> int:
+    """
+    Runs the batch command line.
+
+    Parameters:
+    argv (list): Arguments (defaults to sys.argv[1:])
+
+    Returns:
+    int: Exit status, 1 if any job failed
+    """
+    parser = build_parser()
+    options = parser.parse_args(_attach_slice_values(sys.argv[1:] if argv is None else argv))
+    if options.jobs and _job_arguments(options, parser):
+        print("--jobs cannot be combined with other options; put them in the job file.", file=sys.stderr)
+        return 1
+    try:
+        jobs = read_jobs(options.jobs, parser) if options.jobs else [options]
+    except OSError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    status = 0
+    written = set()  # Output files already written by this run, which later jobs append to
+    for number, job in enumerate(jobs, 1):
+        if job is None:
+            status = 1
+            continue
+        try:
+            write_result(format_pattern(run_job(job), job.format), job.output, job.output in written)
+            written.add(job.output)
+        except (ValueError, OSError) as e:
+            print(f"Error in job {number}: {str(e)}", file=sys.stderr)
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
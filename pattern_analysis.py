@@ -0,0 +1,288 @@
+"""
+Pattern Analysis
+Level, peak, RMS, onset and period measurements for patterns and streams.
+
+Whole-pattern measurements run as single vectorized passes with the numpy
+backend. Rolling versions keep running sums and a monotonic queue, so each
+new step updates the statistics in O(1) amortized time.
+"""
+import math
+from collections import deque
+
+import digital_music_mixer as mixer
+from pattern_types import Pattern
+
+# A step counts as an onset when it rises at least this much above the previous step
+ONSET_THRESHOLD = 20
+
+# Autocorrelation (relative to lag 0) a period must reach to be reported
+MIN_PERIOD_STRENGTH = 0.5
+
+# Shorter lags within this fraction of the strongest are preferred over its multiples
+PERIOD_TOLERANCE = 0.8
+
+def _values(pattern):
+    """Returns a pattern as a NumPy array (numpy backend) or a list or Pattern (python backend)."""
+    if hasattr(pattern, "ndim"):
+        return pattern
+    if not isinstance(pattern, mixer.PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern, lazy pattern or array.")
+    if not isinstance(pattern, (list, Pattern)):
+        pattern = pattern.copy()
+    return pattern
+
+def _numpy_values(pattern, backend: str):
+    """Returns the pattern as an int64 array when the numpy backend is in use, else None."""
+    if mixer._resolve_backend(backend) != mixer.BACKEND_NUMPY:
+        return None
+    np = mixer.np
+    pattern = _values(pattern)
+    if isinstance(pattern, Pattern):
+        return np.frombuffer(pattern.buffer, dtype=np.uint8).astype(np.int64)
+    return np.asarray(pattern, dtype=np.int64)
+
+def mean_level(pattern, backend: str = None) -> float:
+    """Returns the average amplitude, or 0.0 for an empty pattern."""
+    values = _numpy_values(pattern, backend)
+    if values is not None:
+        return float(values.mean()) if len(values) else 0.0
+    values = _values(pattern)
+    return sum(values) / len(values) if len(values) else 0.0
+
+def peak(pattern, backend: str = None) -> int:
+    """Returns the highest amplitude, or 0 for an empty pattern."""
+    values = _numpy_values(pattern, backend)
+    if values is not None:
+        return int(values.max()) if len(values) else 0
+    return max(_values(pattern), default=0)
+
+def rms(pattern, backend: str = None) -> float:
+    """Returns the root-mean-square amplitude, or 0.0 for an empty pattern."""
+    values = _numpy_values(pattern, backend)
+    if values is not None:
+        return math.sqrt(int(values @ values) / len(values)) if len(values) else 0.0
+    values = _values(pattern)
+    return math.sqrt(sum(value * value for value in values) / len(values)) if len(values) else 0.0
+
+def onsets(pattern, threshold: int = ONSET_THRESHOLD, backend: str = None) -> list:
+    """
+    Finds the steps that rise at least threshold above the step before.
+
+    The first step is compared with silence.
+
+    Returns:
+    list: Onset positions in order
+    """
+    values = _numpy_values(pattern, backend)
+    if values is not None:
+        np = mixer.np
+        return np.flatnonzero(np.diff(values, prepend=0) >= threshold).tolist()
+    positions, previous = [], 0
+    for position, value in enumerate(_values(pattern)):
+        if value - previous >= threshold:
+            positions.append(position)
+        previous = value
+    return positions
+
+def _autocorrelation(values, max_lag: int, backend: str) -> list:
+    """Returns the mean-removed autocorrelation for lags 0..max_lag, each averaged over its overlap."""
+    numpy_values = _numpy_values(values, backend)
+    if numpy_values is not None:
+        np = mixer.np
+        centered = numpy_values - numpy_values.mean()
+        size = 1 << (2 * len(centered) - 1).bit_length()
+        spectrum = np.fft.rfft(centered, size)
+        correlation = np.fft.irfft(spectrum * spectrum.conj(), size)[:max_lag + 1]
+        return (correlation / (len(centered) - np.arange(max_lag + 1))).tolist()
+    values = list(_values(values))
+    average = sum(values) / len(values)
+    centered = [value - average for value in values]
+    return [
+        sum(a * b for a, b in zip(centered, centered[lag:])) / (len(centered) - lag)
+        for lag in range(max_lag + 1)
+    ]
+
+def detect_period(pattern, max_period: int = None, backend: str = None) -> int:
+    """
+    Estimates how many steps the pattern takes to repeat, using autocorrelation.
+
+    Among the lags where the correlation peaks, the shortest within 20% of
+    the strongest is chosen, so multiples of the true period are not
+    reported.
+
+    Parameters:
+    pattern: A list, Pattern, lazy pattern or array
+    max_period (int): Longest period to consider; defaults to half the length
+    backend (str): "python" or "numpy"; numpy uses an FFT
+
+    Returns:
+    int: The period in steps, or None if the pattern is not periodic
+    """
+    length = len(pattern)
+    if max_period is None:
+        max_period = length // 2
+    if not isinstance(max_period, int) or max_period < 0:
+        raise ValueError("Max period must be a non-negative integer.")
+    max_period = min(max_period, length - 1)
+    if max_period < 1:
+        return None
+    correlation = _autocorrelation(pattern, max_period, backend)
+    if correlation[0] <= 0:
+        return None
+    # Only local maxima of the correlation count, so slow drifts are not periods
+    strengths = [value / correlation[0] for value in correlation]
+    peaks = [
+        lag for lag in range(1, max_period + 1)
+        if strengths[lag] >= strengths[lag - 1] and (lag == max_period or strengths[lag] >= strengths[lag + 1])
+    ]
+    strongest = max((strengths[lag] for lag in peaks), default=0.0)
+    if strongest < MIN_PERIOD_STRENGTH:
+        return None
+    return next(lag for lag in peaks if strengths[lag] >= PERIOD_TOLERANCE * strongest)
+
+def analyze(pattern, backend: str = None) -> dict:
+    """
+    Computes every measurement for one pattern.
+
+    Returns:
+    dict: mean, peak, rms, onsets (positions) and period
+    """
+    values = _numpy_values(pattern, backend)
+    if values is None:
+        values = _values(pattern)
+    return {
+        "mean": mean_level(values, backend),
+        "peak": peak(values, backend),
+        "rms": rms(values, backend),
+        "onsets": onsets(values, backend=backend),
+        "period": detect_period(values, backend=backend),
+    }
+
+class RollingStats:
+    """
+    Mean, peak, RMS and onset count over the last window steps of a stream.
+
+    Running sums give the mean, RMS and onset count; a monotonic queue of
+    candidate maxima gives the peak. Until window steps have arrived, the
+    statistics cover every step so far.
+    """
+
+    def __init__(self, window: int, threshold: int = ONSET_THRESHOLD):
+        if not isinstance(window, int) or window <= 0:
+            raise ValueError("Window must be a positive integer.")
+        self.window = window
+        self.threshold = threshold
+        self._values = deque()
+        self._flags = deque()
+        self._maxima = deque()  # (step, value) pairs with decreasing values
+        self._sum = self._squares = self._onsets = 0
+        self._previous = 0
+        self._step = 0
+
+    def update(self, value) -> tuple:
+        """
+        Adds one step and returns the window's statistics.
+
+        Returns:
+        tuple: (mean, peak, rms, onsets)
+        """
+        onset = value - self._previous >= self.threshold
+        self._previous = value
+        self._values.append(value)
+        self._flags.append(onset)
+        self._sum += value
+        self._squares += value * value
+        self._onsets += onset
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            self._sum -= old
+            self._squares -= old * old
+            self._onsets -= self._flags.popleft()
+        while self._maxima and self._maxima[-1][1] <= value:
+            self._maxima.pop()
+        self._maxima.append((self._step, value))
+        if self._maxima[0][0] <= self._step - self.window:
+            self._maxima.popleft()
+        self._step += 1
+        return self.stats
+
+    @property
+    def stats(self) -> tuple:
+        """The current (mean, peak, rms, onsets), or zeros before the first step."""
+        count = len(self._values)
+        if not count:
+            return 0.0, 0, 0.0, 0
+        return self._sum / count, self._maxima[0][1], math.sqrt(self._squares / count), self._onsets
+
+def _sliding_max(values, window: int):
+    """Returns the maximum of each window ending at each position (van Herk/Gil-Werman, O(n))."""
+    np = mixer.np
+    floor = values.min()
+    padded = np.concatenate((np.full(window - 1, floor), values))
+    blocks = -(-len(padded) // window)
+    grid = np.full(blocks * window, floor)
+    grid[:len(padded)] = padded
+    grid = grid.reshape(blocks, window)
+    prefix = np.maximum.accumulate(grid, axis=1).ravel()
+    suffix = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    ends = np.arange(window - 1, len(padded))
+    return np.maximum(suffix[ends - window + 1], prefix[ends])
+
+def _numpy_rolling(chunks, window: int, threshold: int):
+    """Yields rolling statistics per chunk, carrying the last window - 1 steps between chunks."""
+    np = mixer.np
+    history = np.zeros(0, dtype=np.int64)
+    history_onsets = np.zeros(0, dtype=np.int64)
+    previous = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.int64)
+        if not len(chunk):
+            continue
+        values = np.concatenate((history, chunk))
+        flags = np.concatenate((history_onsets, np.diff(chunk, prepend=previous) >= threshold))
+
+        # Window sums as differences of cumulative sums
+        ends = np.arange(len(history) + 1, len(values) + 1)
+        starts = np.maximum(ends - window, 0)
+        counts = ends - starts
+        sums = np.concatenate(([0], np.cumsum(values)))
+        squares = np.concatenate(([0], np.cumsum(values * values)))
+        onset_counts = np.concatenate(([0], np.cumsum(flags)))
+        yield {
+            "mean": (sums[ends] - sums[starts]) / counts,
+            "peak": _sliding_max(values, window)[len(history):],
+            "rms": np.sqrt((squares[ends] - squares[starts]) / counts),
+            "onsets": onset_counts[ends] - onset_counts[starts],
+        }
+
+        keep = window - 1
+        history = values[-keep:] if keep else values[:0]
+        history_onsets = flags[-keep:] if keep else flags[:0]
+        previous = int(chunk[-1])
+
+def _python_rolling(chunks, window: int, threshold: int):
+    """Yields rolling statistics per chunk using RollingStats."""
+    rolling = RollingStats(window, threshold)
+    for chunk in chunks:
+        rows = [rolling.update(value) for value in chunk]
+        if rows:
+            yield dict(zip(("mean", "peak", "rms", "onsets"), map(list, zip(*rows))))
+
+def rolling_stats(chunks, window: int, threshold: int = ONSET_THRESHOLD, backend: str = None):
+    """
+    Computes rolling statistics over a chunked stream, e.g. from stream_pattern.
+
+    Parameters:
+    chunks: Iterable of chunks (lists, Patterns or arrays)
+    window (int): Number of steps per window
+    threshold (int): Onset threshold
+    backend (str): "python" or "numpy"; numpy processes each chunk in O(chunk + window)
+
+    Returns:
+    Generator of dicts with "mean", "peak", "rms" and "onsets" sequences, one value per step of each chunk
+    """
+    if not isinstance(window, int) or window <= 0:
+        raise ValueError("Window must be a positive integer.")
+    if mixer._resolve_backend(backend) == mixer.BACKEND_NUMPY:
+        return _numpy_rolling(chunks, window, threshold)
+    return _python_rolling(chunks, window, threshold)
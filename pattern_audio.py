@@ -0,0 +1,181 @@
+"""
+Pattern Audio
+Renders patterns to 16-bit mono PCM and WAV files.
+
+Each step becomes a note whose loudness is the step's amplitude: an
+oscillator at a fixed frequency shaped by a short attack and an
+exponential decay. Audio is produced in fixed-size blocks that reuse
+preallocated buffers, so memory stays constant however long the render.
+"""
+import math
+import sys
+import wave
+from array import array
+
+import digital_music_mixer as mixer
+
+WAVEFORMS = ("sine", "square", "saw")
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 65536  # Frames rendered per block
+ATTACK = 0.005  # Seconds of linear fade-in at the start of each step
+FULL_SCALE = 32767
+
+def samples_per_step(bpm: float, steps_per_beat: int = 4, sample_rate: int = SAMPLE_RATE) -> float:
+    """Returns the (fractional) number of audio frames in one pattern step."""
+    return sample_rate * 60 / (bpm * steps_per_beat)
+
+def _envelope(length: int, sample_rate: int, decay: float) -> list:
+    """Returns the per-frame envelope for a step of length frames."""
+    attack = max(1, int(ATTACK * sample_rate))
+    return [
+        min(1.0, frame / attack) * math.exp(-frame / (decay * sample_rate))
+        for frame in range(length)
+    ]
+
+def _oscillator(phase: float, waveform: str) -> float:
+    """Returns the waveform's value at a phase in [0, 1)."""
+    if waveform == "sine":
+        return math.sin(2 * math.pi * phase)
+    if waveform == "square":
+        return 1.0 if phase < 0.5 else -1.0
+    return 2 * phase - 1
+
+def _step_at(frame: int, step_frames: float) -> int:
+    """Returns the step whose frames [round(i * step_frames), round((i + 1) * step_frames)) contain frame."""
+    step = int(frame // step_frames)
+    while round((step + 1) * step_frames) <= frame:
+        step += 1
+    while step > 0 and round(step * step_frames) > frame:
+        step -= 1
+    return step
+
+def _python_blocks(pattern, step_frames: float, envelope: list, frequency: float, sample_rate: int,
+                   waveform: str, volume: float, block_size: int):
+    """Yields PCM blocks, filling one preallocated array frame by frame."""
+    block = array("h", bytes(2 * block_size))
+    used = 0
+    cycles = frequency / sample_rate
+    for step, value in enumerate(pattern):
+        start, stop = round(step * step_frames), round((step + 1) * step_frames)
+        level = value / 100 * volume * FULL_SCALE
+        for frame in range(start, stop):
+            phase = frame * cycles % 1.0
+            block[used] = int(round(level * envelope[frame - start] * _oscillator(phase, waveform)))
+            used += 1
+            if used == block_size:
+                yield block.tobytes() if sys.byteorder == "little" else _swapped(block)
+                used = 0
+    if used:
+        tail = block[:used]
+        yield tail.tobytes() if sys.byteorder == "little" else _swapped(tail)
+
+def _swapped(block: array) -> bytes:
+    swapped = array("h", block)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+def _numpy_blocks(pattern, step_frames: float, envelope: list, frequency: float, sample_rate: int,
+                  waveform: str, volume: float, block_size: int):
+    """Yields PCM blocks computed with NumPy, reusing the same buffers for every block."""
+    np = mixer.np
+    envelope = np.asarray(envelope)
+    total = round(len(pattern) * step_frames)
+    offsets = np.arange(block_size, dtype=np.float64)
+    frames = np.empty(block_size)
+    signal = np.empty(block_size)
+    output = np.empty(block_size, dtype="<i2")
+    for start in range(0, total, block_size):
+        size = min(block_size, total - start)
+        n, wave_out, pcm = frames[:size], signal[:size], output[:size]
+        np.add(offsets[:size], start, out=n)
+
+        # Locate each frame's step and its position within the step
+        first, last = _step_at(start, step_frames), _step_at(start + size - 1, step_frames)
+        bounds = np.rint(np.arange(first, last + 2) * step_frames)
+        local = np.searchsorted(bounds, n, side="right") - 1
+        levels = np.fromiter(pattern[first:last + 1], dtype=np.float64, count=last - first + 1)
+        levels *= volume * FULL_SCALE / 100
+
+        # Oscillator phase in cycles, then the waveform in place
+        np.multiply(n, frequency / sample_rate, out=wave_out)
+        np.mod(wave_out, 1.0, out=wave_out)
+        if waveform == "sine":
+            wave_out *= 2 * np.pi
+            np.sin(wave_out, out=wave_out)
+        elif waveform == "square":
+            np.copyto(wave_out, np.where(wave_out < 0.5, 1.0, -1.0))
+        else:
+            wave_out *= 2
+            wave_out -= 1
+
+        wave_out *= levels[local]
+        wave_out *= envelope[(n - bounds[local]).astype(np.intp)]
+        np.rint(wave_out, out=wave_out)
+        pcm[:] = wave_out
+        yield pcm.tobytes()
+
+def render_frames(pattern, bpm: float = 120, steps_per_beat: int = 4, sample_rate: int = SAMPLE_RATE,
+                  frequency: float = 220.0, waveform: str = "sine", decay: float = 0.1, volume: float = 0.8,
+                  block_size: int = BLOCK_SIZE, backend: str = None):
+    """
+    Renders a pattern to 16-bit little-endian mono PCM, one block at a time.
+
+    Parameters:
+    pattern: A list, Pattern or lazy pattern
+    bpm (float): Tempo in beats per minute
+    steps_per_beat (int): Pattern steps per beat
+    sample_rate (int): Audio frames per second
+    frequency (float): Oscillator frequency in Hz
+    waveform (str): "sine", "square" or "saw"
+    decay (float): Time constant of each note's exponential decay, in seconds
+    volume (float): Output level for amplitude 100, between 0 and 1
+    block_size (int): Frames per yielded block
+    backend (str): "python" or "numpy"; defaults to the module backend
+
+    Returns:
+    Generator of bytes, each holding at most block_size frames
+    """
+    if not isinstance(pattern, mixer.PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+    for name, value in (("BPM", bpm), ("Frequency", frequency), ("Decay", decay)):
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"{name} must be a positive number.")
+    for name, value in (("Steps per beat", steps_per_beat), ("Sample rate", sample_rate),
+                        ("Block size", block_size)):
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError(f"{name} must be a positive integer.")
+    if waveform not in WAVEFORMS:
+        raise ValueError("Waveform must be one of: " + ", ".join(WAVEFORMS) + ".")
+    if not isinstance(volume, (int, float)) or not 0 <= volume <= 1:
+        raise ValueError("Volume must be between 0 and 1.")
+
+    step_frames = samples_per_step(bpm, steps_per_beat, sample_rate)
+    envelope = _envelope(math.ceil(step_frames) + 1, sample_rate, decay)
+    if mixer._resolve_backend(backend) == mixer.BACKEND_NUMPY:
+        blocks = _numpy_blocks
+    else:
+        blocks = _python_blocks
+    return blocks(pattern, step_frames, envelope, frequency, sample_rate, waveform, volume, block_size)
+
+def render_wav(pattern, file, **options) -> int:
+    """
+    Renders a pattern to a mono 16-bit WAV file.
+
+    Parameters:
+    pattern: A list, Pattern or lazy pattern
+    file: Path or writable binary file object
+    **options: Any render_frames option (bpm, sample_rate, waveform, ...)
+
+    Returns:
+    int: Number of audio frames written
+    """
+    blocks = render_frames(pattern, **options)
+    frames = 0
+    with wave.open(file, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(options.get("sample_rate", SAMPLE_RATE))
+        for block in blocks:
+            output.writeframes(block)
+            frames += len(block) // 2
+    return frames
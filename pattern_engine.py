@@ -0,0 +1,258 @@
+"""
+Pattern Generation Engine
+Generates large pattern libraries in parallel across CPU cores.
+"""
+import os
+import secrets
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import digital_music_mixer as mixer
+from pattern_types import PatternRows
+
+# Upper bound on samples generated from a single random stream; the number of
+# patterns per stream depends only on the pattern length, so results for a
+# given seed do not depend on how the work is chunked or scheduled.
+STREAM_SAMPLES = 1 << 20
+MAX_PATTERNS_PER_STREAM = 256
+
+def patterns_per_stream(length: int) -> int:
+    """
+    Returns how many consecutive patterns share one random stream.
+
+    Parameters:
+    length (int): Length of each pattern
+
+    Returns:
+    int: Patterns per stream
+    """
+    return max(1, min(MAX_PATTERNS_PER_STREAM, STREAM_SAMPLES // length))
+
+def _generate_chunk(name: str, kind: str, length: int, count: int, seed: int,
+                    first_stream: int, last_stream: int, backend: str) -> tuple:
+    """
+    Worker entry point: fills the rows for streams [first_stream, last_stream).
+
+    Returns:
+    tuple: (worker pid, patterns generated, seconds spent)
+    """
+    started = time.perf_counter()
+    shm = shared_memory.SharedMemory(name=name)
+    per_stream = patterns_per_stream(length)
+    generated = 0
+    try:
+        for stream in range(first_stream, last_stream):
+            start = stream * per_stream
+            stop = min(count, start + per_stream)
+            rng = mixer.get_stream(seed, stream, backend)
+            block = mixer.create_patterns(kind, length, stop - start, backend, rng=rng)
+            if isinstance(block, PatternRows):
+                block = block.block
+            block = block.tobytes()
+            shm.buf[start * length:stop * length] = block
+            generated += stop - start
+    finally:
+        shm.close()
+    return os.getpid(), generated, time.perf_counter() - started
+
+class GenerationResult:
+    """
+    Patterns produced by the engine, stored row-major in shared memory.
+
+    The result owns the shared memory block; call close() (or use it as a
+    context manager) once the patterns are no longer needed.
+    """
+    __slots__ = ("kind", "length", "count", "seed", "worker_stats", "elapsed", "_shm")
+
+    def __init__(self, shm, kind: str, length: int, count: int, seed: int,
+                 worker_stats: dict, elapsed: float):
+        self._shm = shm
+        self.kind = kind
+        self.length = length
+        self.count = count
+        self.seed = seed
+        self.worker_stats = worker_stats
+        self.elapsed = elapsed
+
+    @property
+    def buffer(self) -> memoryview:
+        """Row-major uint8 samples for all patterns."""
+        return self._shm.buf[:self.count * self.length]
+
+    def as_array(self):
+        """Returns a zero-copy (count, length) NumPy view of the patterns."""
+        if mixer.np is None:
+            raise ValueError("NumPy is required for as_array().")
+        return mixer.np.ndarray((self.count, self.length), dtype=mixer.np.uint8, buffer=self._shm.buf)
+
+    def pattern(self, index: int) -> list:
+        """Returns one pattern as a list of integers."""
+        if not isinstance(index, int) or not -self.count <= index < self.count:
+            raise ValueError("Index out of range.")
+        index %= self.count
+        return list(self._shm.buf[index * self.length:(index + 1) * self.length])
+
+    def throughput(self) -> float:
+        """Returns the overall throughput in samples per second."""
+        return self.count * self.length / self.elapsed if self.elapsed else 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.pattern(index)
+
+    def close(self) -> None:
+        """Releases and removes the shared memory block."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class PatternEngine:
+    """
+    Process-pool engine that fans pattern generation out across cores.
+
+    Work is split into random streams of patterns_per_stream(length)
+    patterns each, so a seed always gives the same library. Streams are
+    handed out in adaptively sized chunks: chunk size shrinks as the
+    remaining work does (guided scheduling) and is capped by the measured
+    throughput so each chunk takes about target_seconds.
+    """
+
+    def __init__(self, workers: int = None, backend: str = None, target_seconds: float = 0.25):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if not isinstance(workers, int) or workers <= 0:
+            raise ValueError("Workers must be a positive integer.")
+        if not isinstance(target_seconds, (int, float)) or target_seconds <= 0:
+            raise ValueError("Target seconds must be a positive number.")
+        self.workers = workers
+        self.backend = mixer._resolve_backend(backend)
+        self.target_seconds = target_seconds
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Starts the worker pool on first use and reuses it afterwards."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _chunk_size(self, remaining: int, streams_per_second: float) -> int:
+        """Picks the number of streams for the next chunk."""
+        size = max(1, remaining // (2 * self.workers))
+        if streams_per_second:
+            size = min(size, max(1, int(streams_per_second * self.target_seconds)))
+        return size
+
+    def generate(self, kind: str, length: int, count: int, seed: int = None) -> GenerationResult:
+        """
+        Generates count patterns of one kind in parallel.
+
+        Parameters:
+        kind (str): One of "bass", "melody", "percussion" or "ambient"
+        length (int): Length of each pattern
+        count (int): Number of patterns to generate
+        seed (int): Root seed; a random one is chosen (and reported) if omitted
+
+        Returns:
+        GenerationResult: Patterns in shared memory plus per-worker statistics
+        """
+        if kind not in mixer.PATTERN_KINDS:
+            raise ValueError("Kind must be one of: " + ", ".join(mixer.PATTERN_KINDS) + ".")
+        if not isinstance(length, int) or length <= 0:
+            raise ValueError("Length must be a positive integer.")
+        if not isinstance(count, int) or count <= 0:
+            raise ValueError("Count must be a positive integer.")
+        if seed is None:
+            seed = secrets.randbits(64)
+        elif not mixer._is_seed(seed):
+            raise ValueError("Seed must be an integer.")
+
+        started = time.perf_counter()
+        per_stream = patterns_per_stream(length)
+        total_streams = -(-count // per_stream)
+        shm = shared_memory.SharedMemory(create=True, size=count * length)
+        executor = self._get_executor()
+        worker_stats = {}
+        pending = {}
+        next_stream = 0
+        streams_per_second = 0.0
+
+        def submit(size):
+            nonlocal next_stream
+            last = min(total_streams, next_stream + size)
+            future = executor.submit(_generate_chunk, shm.name, kind, length, count, seed,
+                                     next_stream, last, self.backend)
+            pending[future] = last - next_stream
+            next_stream = last
+
+        try:
+            # Probe with single-stream chunks to measure throughput first
+            while next_stream < total_streams and len(pending) < 2 * self.workers:
+                submit(1)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    streams = pending.pop(future)
+                    pid, generated, seconds = future.result()
+                    stats = worker_stats.setdefault(pid, {"chunks": 0, "patterns": 0, "samples": 0, "seconds": 0.0})
+                    stats["chunks"] += 1
+                    stats["patterns"] += generated
+                    stats["samples"] += generated * length
+                    stats["seconds"] += seconds
+                    if seconds > 0:
+                        rate = streams / seconds
+                        streams_per_second = rate if not streams_per_second else 0.5 * (streams_per_second + rate)
+                    if next_stream < total_streams:
+                        submit(self._chunk_size(total_streams - next_stream, streams_per_second))
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            shm.close()
+            shm.unlink()
+            raise
+
+        for stats in worker_stats.values():
+            stats["samples_per_second"] = stats["samples"] / stats["seconds"] if stats["seconds"] else 0.0
+        return GenerationResult(shm, kind, length, count, seed, worker_stats, time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        """Stops the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+def generate_library(kind: str, length: int, count: int, seed: int = None,
+                     workers: int = None, backend: str = None) -> GenerationResult:
+    """
+    Generates a pattern library with a temporary PatternEngine.
+
+    Parameters:
+    kind (str): One of "bass", "melody", "percussion" or "ambient"
+    length (int): Length of each pattern
+    count (int): Number of patterns to generate
+    seed (int): Root seed; a random one is chosen (and reported) if omitted
+    workers (int): Number of worker processes; defaults to the CPU count
+    backend (str): "python" or "numpy"; defaults to the module backend
+
+    Returns:
+    GenerationResult: Patterns in shared memory plus per-worker statistics
+    """
+    with PatternEngine(workers, backend) as engine:
+        return engine.generate(kind, length, count, seed)
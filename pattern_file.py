@@ -0,0 +1,210 @@
+"""
+Pattern Files
+Compact binary storage for pattern libraries with memory-mapped loading.
+
+Layout (little-endian):
+    header   magic b"DMMP", version (u16), reserved (u16), pattern count (u64),
+             data offset (u64), index offset (u64)
+    data     every pattern's samples as uint8, back to back
+    index    one entry per pattern: data offset (u64), length (u64), kind (u8),
+             7 bytes padding
+
+The index is written last so patterns can be streamed to disk as they are
+produced; readers locate any pattern through it without touching the rest
+of the file.
+"""
+import mmap
+import struct
+
+import digital_music_mixer as mixer
+from pattern_types import Pattern, pattern_bytes
+
+MAGIC = b"DMMP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQQ")
+INDEX_ENTRY = struct.Struct("<QQB7x")
+
+# Kind codes stored in the index; 0 means the kind is not recorded
+KIND_CODES = {kind: code for code, kind in enumerate(mixer.PATTERN_KINDS, 1)}
+KINDS_BY_CODE = {code: kind for kind, code in KIND_CODES.items()}
+
+def _kind_code(kind: str) -> int:
+    """Returns the index code for a pattern kind, 0 when no kind is given."""
+    if kind is None:
+        return 0
+    if kind not in KIND_CODES:
+        raise ValueError("Kind must be one of: " + ", ".join(mixer.PATTERN_KINDS) + ".")
+    return KIND_CODES[kind]
+
+class PatternFileWriter:
+    """
+    Streams patterns into a pattern file.
+
+    Samples are written as patterns are appended; the index and final
+    header are written by close(), so use the writer as a context manager.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, HEADER.size, 0))
+        self._offset = HEADER.size
+        self._index = bytearray()
+        self.count = 0
+
+    def append(self, pattern, kind: str = None) -> int:
+        """
+        Appends one pattern.
+
+        Parameters:
+        pattern: A list, Pattern, lazy pattern or 1-D NumPy array
+        kind (str): Optional pattern kind to record in the index
+
+        Returns:
+        int: The pattern's position in the file
+        """
+        if not isinstance(pattern, mixer.PATTERN_TYPES) and not hasattr(pattern, "astype"):
+            raise ValueError("Pattern must be a list, Pattern, lazy pattern or array.")
+        data = pattern_bytes(pattern)
+        self._file.write(data)
+        self._index += INDEX_ENTRY.pack(self._offset, len(data), _kind_code(kind))
+        self._offset += len(data)
+        self.count += 1
+        return self.count - 1
+
+    def append_block(self, block, kind: str = None) -> None:
+        """
+        Appends a (count, length) block of patterns, e.g. from create_patterns, in one write.
+
+        Parameters:
+        block: 2-D NumPy array or list of equal-length patterns
+        kind (str): Optional pattern kind to record for every row
+        """
+        if hasattr(block, "astype"):
+            if block.ndim != 2:
+                raise ValueError("Block must be two-dimensional.")
+            rows, length = block.shape
+            data = pattern_bytes(block)
+        else:
+            rows = len(block)
+            length = len(block[0]) if rows else 0
+            if any(len(pattern) != length for pattern in block):
+                raise ValueError("Block patterns must all have the same length.")
+            data = b"".join(map(pattern_bytes, block))
+        code = _kind_code(kind)
+        self._file.write(data)
+        for row in range(rows):
+            self._index += INDEX_ENTRY.pack(self._offset + row * length, length, code)
+        self._offset += len(data)
+        self.count += rows
+
+    def close(self) -> None:
+        """Writes the index and header and closes the file."""
+        if self._file.closed:
+            return
+        self._file.write(self._index)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, self.count, HEADER.size, self._offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_patterns(path: str, patterns, kinds=None) -> int:
+    """
+    Writes many patterns to a new pattern file.
+
+    Parameters:
+    path (str): Destination file
+    patterns: Iterable of patterns
+    kinds: Optional iterable of kinds matching patterns, or a single kind for all
+
+    Returns:
+    int: Number of patterns written
+    """
+    with PatternFileWriter(path) as writer:
+        if kinds is None or isinstance(kinds, str):
+            for pattern in patterns:
+                writer.append(pattern, kinds)
+        else:
+            for pattern, kind in zip(patterns, kinds):
+                writer.append(pattern, kind)
+        return writer.count
+
+class PatternFile:
+    """
+    A memory-mapped, read-only pattern file.
+
+    Opening maps the file and reads only the header, so it is O(1) in the
+    file size; each pattern is found through its index entry and read on
+    demand. raw() returns zero-copy views, which must be released before
+    close().
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < HEADER.size:
+                raise ValueError("Not a pattern file.")
+            magic, version, _, count, data_offset, index_offset = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError("Not a pattern file.")
+            if version != VERSION:
+                raise ValueError(f"Unsupported pattern file version {version}.")
+            if index_offset + count * INDEX_ENTRY.size > len(self._map):
+                raise ValueError("Pattern file is truncated.")
+        except ValueError:
+            self._map.close()
+            raise
+        self._count = count
+        self._index_offset = index_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, index: int) -> tuple:
+        if not isinstance(index, int) or not -self._count <= index < self._count:
+            raise IndexError("Pattern index out of range")
+        index %= self._count
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + index * INDEX_ENTRY.size)
+
+    def raw(self, index: int) -> memoryview:
+        """Returns a zero-copy, read-only view of one pattern's samples."""
+        offset, length, _ = self._entry(index)
+        return memoryview(self._map)[offset:offset + length]
+
+    def length(self, index: int) -> int:
+        """Returns one pattern's length."""
+        return self._entry(index)[1]
+
+    def kind(self, index: int) -> str:
+        """Returns one pattern's recorded kind, or None."""
+        return KINDS_BY_CODE.get(self._entry(index)[2])
+
+    def as_array(self, index: int):
+        """Returns a zero-copy NumPy view of one pattern."""
+        if mixer.np is None:
+            raise ValueError("NumPy is required for as_array().")
+        offset, length, _ = self._entry(index)
+        return mixer.np.frombuffer(self._map, dtype=mixer.np.uint8, count=length, offset=offset)
+
+    def __getitem__(self, index: int) -> Pattern:
+        offset, length, _ = self._entry(index)
+        return Pattern(self._map[offset:offset + length])
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,109 @@
+"""
+Pattern History
+Undo/redo for pattern transformations.
+"""
+from collections import deque
+
+from pattern_types import nesting
+
+# Versions wrapped in more lazy layers than this are copied when recorded,
+# so indexing the current pattern never walks an unbounded chain of views.
+MAX_NESTING = 8
+
+class PatternHistory:
+    """
+    Undo and redo stacks of (operation, pattern) versions.
+
+    Versions are stored as returned by the transformations, so the lazy
+    results of reverse_list(view=True), slice_list(view=True),
+    extend_list(lazy=True) and combine_lists(rope=True) share structure
+    with the versions before them. A version wrapped in more than
+    MAX_NESTING lazy layers is copied when recorded, which keeps indexing
+    it cheap: most steps cost O(1) memory beyond the new nodes, and about
+    one in MAX_NESTING / 2 interleaved edits copies the pattern. Undo and
+    redo only move a version between the stacks and are O(1).
+    """
+
+    def __init__(self, pattern=None, operation: str = "Start", limit: int = None):
+        """
+        Parameters:
+        pattern: The starting version, if any
+        operation (str): Description of the starting version
+        limit (int): Maximum number of undo steps kept; unlimited if omitted
+        """
+        if limit is not None and (not isinstance(limit, int) or limit <= 0):
+            raise ValueError("Limit must be a positive integer.")
+        self._undo = deque(maxlen=None if limit is None else limit + 1)
+        self._redo = []
+        if pattern is not None:
+            self._undo.append((operation, pattern))
+
+    @property
+    def current(self):
+        """The current pattern, or None before the first version."""
+        return self._undo[-1][1] if self._undo else None
+
+    @property
+    def operation(self) -> str:
+        """Description of the operation that produced the current pattern."""
+        return self._undo[-1][0] if self._undo else None
+
+    @property
+    def can_undo(self) -> bool:
+        return len(self._undo) > 1
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def reset(self, pattern, operation: str = "Start") -> None:
+        """Starts a new history with pattern as its only version."""
+        self._undo.clear()
+        self._redo.clear()
+        self._undo.append((operation, pattern))
+
+    def record(self, operation: str, pattern):
+        """
+        Adds a new version and discards anything that could be redone.
+
+        A lazy pattern nested more than MAX_NESTING layers deep is
+        recorded as a copy.
+
+        Parameters:
+        operation (str): Description of the transformation
+        pattern: The transformed pattern
+
+        Returns:
+        The recorded pattern
+        """
+        if nesting(pattern) > MAX_NESTING:
+            pattern = pattern.copy()
+        self._undo.append((operation, pattern))
+        self._redo.clear()
+        return pattern
+
+    def undo(self) -> tuple:
+        """
+        Steps back one version.
+
+        Returns:
+        tuple: (undone operation, pattern now current)
+        """
+        if not self.can_undo:
+            raise ValueError("Nothing to undo.")
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return entry[0], self.current
+
+    def redo(self) -> tuple:
+        """
+        Reapplies the last undone version.
+
+        Returns:
+        tuple: (redone operation, pattern now current)
+        """
+        if not self.can_redo:
+            raise ValueError("Nothing to redo.")
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return entry
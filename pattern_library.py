@@ -0,0 +1,249 @@
+"""
+Pattern Library
+Persistent pattern store with an index on kind, length and amplitude statistics.
+
+Patterns and their statistics are kept in an SQLite database. Every
+statistic has its own B-tree index, so a search on any of them, with or
+without a kind, reads only matching index entries instead of scanning
+the library. A composite (kind, length, peak) index serves the most
+common search, such as "percussion, length 32, peak > 90", directly.
+"""
+import sqlite3
+
+import digital_music_mixer as mixer
+from pattern_analysis import ONSET_THRESHOLD
+from pattern_types import Pattern, check_array, pattern_bytes
+
+STAT_FIELDS = ("length", "mean", "peak", "energy", "onsets")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    id INTEGER PRIMARY KEY,
+    kind TEXT,
+    length INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    peak INTEGER NOT NULL,
+    energy INTEGER NOT NULL,
+    onsets INTEGER NOT NULL,
+    samples BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patterns_kind_length_peak ON patterns (kind, length, peak);
+CREATE INDEX IF NOT EXISTS patterns_by_length ON patterns (length);
+CREATE INDEX IF NOT EXISTS patterns_by_mean ON patterns (mean);
+CREATE INDEX IF NOT EXISTS patterns_by_peak ON patterns (peak);
+CREATE INDEX IF NOT EXISTS patterns_by_energy ON patterns (energy);
+CREATE INDEX IF NOT EXISTS patterns_by_onsets ON patterns (onsets);
+"""
+
+_INSERT = (
+    "INSERT INTO patterns (kind, length, mean, peak, energy, onsets, samples) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+def pattern_stats(pattern) -> dict:
+    """
+    Computes the statistics stored in the library index.
+
+    Parameters:
+    pattern: A list, Pattern or lazy pattern
+
+    Returns:
+    dict: length, mean, peak, energy (sum of squared amplitudes) and onsets
+    """
+    length = len(pattern)
+    if not length:
+        return {"length": 0, "mean": 0.0, "peak": 0, "energy": 0, "onsets": 0}
+
+    total = peak = energy = onsets = previous = 0
+    for value in pattern:
+        total += value
+        energy += value * value
+        if value > peak:
+            peak = value
+        if value - previous >= ONSET_THRESHOLD:
+            onsets += 1
+        previous = value
+    return {"length": length, "mean": total / length, "peak": peak, "energy": energy, "onsets": onsets}
+
+def _block_stats(block) -> list:
+    """Computes pattern_stats for every row of a 2-D NumPy block in vectorized passes."""
+    np = mixer.np
+    rows, length = block.shape
+    values = block.astype(np.int64)
+    if not length:
+        return [pattern_stats([]) for _ in range(rows)]
+
+    totals = values.sum(axis=1)
+    peaks = values.max(axis=1)
+    energies = np.einsum("ij,ij->i", values, values)
+    rises = np.diff(values, axis=1, prepend=0)
+    onsets = np.count_nonzero(rises >= ONSET_THRESHOLD, axis=1)
+    return [
+        {"length": length, "mean": total / length, "peak": int(peak), "energy": int(energy), "onsets": int(count)}
+        for total, peak, energy, count in zip(totals.tolist(), peaks.tolist(), energies.tolist(), onsets.tolist())
+    ]
+
+def _where(kind: str, filters: dict) -> tuple:
+    """Builds a WHERE clause from a kind and field filters."""
+    clauses, parameters = [], []
+    if kind is not None:
+        if kind not in mixer.PATTERN_KINDS:
+            raise ValueError("Kind must be one of: " + ", ".join(mixer.PATTERN_KINDS) + ".")
+        clauses.append("kind = ?")
+        parameters.append(kind)
+    for field, condition in filters.items():
+        if field not in STAT_FIELDS:
+            raise ValueError("Filters must be one of: " + ", ".join(STAT_FIELDS) + ".")
+        if isinstance(condition, tuple):
+            if len(condition) != 2:
+                raise ValueError("Range filters must be (low, high) tuples.")
+            low, high = condition
+            if low is not None:
+                clauses.append(f"{field} >= ?")
+                parameters.append(low)
+            if high is not None:
+                clauses.append(f"{field} <= ?")
+                parameters.append(high)
+        else:
+            clauses.append(f"{field} = ?")
+            parameters.append(condition)
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return where, parameters
+
+class PatternLibrary:
+    """
+    A persistent, indexed collection of patterns.
+
+    Pass ":memory:" as the path for a library that is not saved. Use the
+    library as a context manager, or call close(), to release the file.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def _insert(self, rows) -> None:
+        with self._db:
+            self._db.executemany(_INSERT, rows)
+
+    def add(self, pattern, kind: str = None) -> int:
+        """
+        Stores one pattern.
+
+        Parameters:
+        pattern: A list, Pattern or lazy pattern
+        kind (str): Optional pattern kind, e.g. "bass"
+
+        Returns:
+        int: The pattern's id
+        """
+        if not isinstance(pattern, mixer.PATTERN_TYPES):
+            raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+        if kind is not None and kind not in mixer.PATTERN_KINDS:
+            raise ValueError("Kind must be one of: " + ", ".join(mixer.PATTERN_KINDS) + ".")
+        samples = pattern_bytes(pattern)
+        stats = pattern_stats(samples)
+        with self._db:
+            cursor = self._db.execute(_INSERT, (kind, *(stats[field] for field in STAT_FIELDS), samples))
+        return cursor.lastrowid
+
+    def add_many(self, patterns, kind: str = None) -> int:
+        """
+        Stores many patterns of one kind in a single transaction.
+
+        A 2-D NumPy block, such as create_patterns returns, has its
+        statistics computed for all rows at once.
+
+        Parameters:
+        patterns: Iterable of patterns or a (count, length) NumPy array
+        kind (str): Optional kind recorded for every pattern
+
+        Returns:
+        int: Number of patterns stored
+        """
+        if kind is not None and kind not in mixer.PATTERN_KINDS:
+            raise ValueError("Kind must be one of: " + ", ".join(mixer.PATTERN_KINDS) + ".")
+        if hasattr(patterns, "ndim"):
+            if patterns.ndim != 2:
+                raise ValueError("Block must be two-dimensional.")
+            check_array(patterns)
+            block = patterns.astype("uint8")
+            rows = [
+                (kind, *(stats[field] for field in STAT_FIELDS), row.tobytes())
+                for stats, row in zip(_block_stats(block), block)
+            ]
+        else:
+            rows = []
+            for pattern in patterns:
+                samples = pattern_bytes(pattern)
+                stats = pattern_stats(samples)
+                rows.append((kind, *(stats[field] for field in STAT_FIELDS), samples))
+        self._insert(rows)
+        return len(rows)
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM patterns").fetchone()[0]
+
+    def get(self, pattern_id: int) -> Pattern:
+        """Returns the stored pattern with the given id."""
+        row = self._db.execute("SELECT samples FROM patterns WHERE id = ?", (pattern_id,)).fetchone()
+        if row is None:
+            raise KeyError(pattern_id)
+        return Pattern(row[0])
+
+    def info(self, pattern_id: int) -> dict:
+        """Returns the kind and statistics of a stored pattern."""
+        row = self._db.execute(
+            "SELECT kind, length, mean, peak, energy, onsets FROM patterns WHERE id = ?", (pattern_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(pattern_id)
+        return dict(zip(("kind",) + STAT_FIELDS, row))
+
+    def query(self, kind: str = None, limit: int = None, **filters) -> list:
+        """
+        Finds patterns by kind and statistics using the index.
+
+        Each filter is a value to match exactly or an inclusive (low, high)
+        range where None leaves that end open, e.g.
+        query("percussion", length=32, peak=(91, None)).
+
+        Parameters:
+        kind (str): Optional kind to match
+        limit (int): Optional maximum number of ids to return
+        **filters: Conditions on length, mean, peak, energy or onsets
+
+        Returns:
+        list: Matching pattern ids in insertion order
+        """
+        where, parameters = _where(kind, filters)
+        # "+id" stops SQLite from scanning the table in id order to skip the sort
+        # when only a one-sided range is given, so the filter's index is used
+        sql = "SELECT id FROM patterns" + where + (" ORDER BY +id" if where else " ORDER BY id")
+        if limit is not None:
+            if not isinstance(limit, int) or limit < 0:
+                raise ValueError("Limit must be a non-negative integer.")
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [row[0] for row in self._db.execute(sql, parameters)]
+
+    def count(self, kind: str = None, **filters) -> int:
+        """Counts patterns matching the same conditions as query()."""
+        where, parameters = _where(kind, filters)
+        return self._db.execute("SELECT COUNT(*) FROM patterns" + where, parameters).fetchone()[0]
+
+    def remove(self, pattern_id: int) -> None:
+        """Deletes a stored pattern."""
+        with self._db:
+            if self._db.execute("DELETE FROM patterns WHERE id = ?", (pattern_id,)).rowcount == 0:
+                raise KeyError(pattern_id)
+
+    def close(self) -> None:
+        """Closes the library file."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,139 @@
+"""
+Pattern Mipmaps
+Multi-resolution summaries for zooming and panning over long patterns.
+"""
+import operator
+from array import array
+
+import digital_music_mixer as mixer
+
+AGGREGATES = ("min", "max", "mean")
+
+def _halve(values: array, typecode: str, combine) -> array:
+    """Combines neighbouring pairs of a level into the next, coarser level."""
+    result = array(typecode, map(combine, values[0::2], values[1::2]))
+    if len(values) % 2:
+        result.append(values[-1])
+    return result
+
+class PatternMipmap:
+    """
+    A precomputed min/max/sum pyramid over a pattern.
+
+    Level k summarizes aligned buckets of 2**k steps, so any range of steps
+    is covered by O(log n) buckets and a viewport of w columns renders in
+    O(w log n) regardless of the pattern length. Building the pyramid is
+    O(n); level 0 is a one-byte-per-step copy of the pattern, so later
+    changes to the pattern are not reflected in the summary.
+    """
+    __slots__ = ("_base", "_mins", "_maxs", "_sums")
+
+    def __init__(self, pattern):
+        if not isinstance(pattern, mixer.PATTERN_TYPES):
+            raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+        if not isinstance(pattern, (list, mixer.Pattern)):
+            pattern = pattern.copy()
+        try:
+            level = array("B", pattern)
+        except (TypeError, OverflowError):
+            raise ValueError("Pattern values must be integers in the range 0-255.") from None
+        self._base = level
+        self._mins = [level]
+        self._maxs = [level]
+        self._sums = [array("Q", level)]
+        while len(self._mins[-1]) > 1:
+            self._mins.append(_halve(self._mins[-1], "B", min))
+            self._maxs.append(_halve(self._maxs[-1], "B", max))
+            self._sums.append(_halve(self._sums[-1], "Q", operator.add))
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    @property
+    def levels(self) -> int:
+        """Number of levels, including the full-resolution level 0."""
+        return len(self._mins)
+
+    def summarize(self, start: int, stop: int) -> tuple:
+        """
+        Returns (min, max, mean) over steps [start, stop).
+
+        The range is split into the largest aligned buckets that fit, at
+        most two per level.
+        """
+        if not 0 <= start < stop <= len(self._base):
+            raise ValueError("Range must be non-empty and within the pattern.")
+        top = len(self._mins) - 1
+        low, high, total, count = 255, 0, 0, stop - start
+        while start < stop:
+            level = (start & -start).bit_length() - 1 if start else top
+            level = min(level, top, (stop - start).bit_length() - 1)
+            index = start >> level
+            low = min(low, self._mins[level][index])
+            high = max(high, self._maxs[level][index])
+            total += self._sums[level][index]
+            start += 1 << level
+        return low, high, total / count
+
+    def columns(self, offset: int = 0, span: int = None, width: int = 50, aggregate: str = "max") -> list:
+        """
+        Aggregates a viewport into at most width column values.
+
+        Parameters:
+        offset (int): First step of the viewport
+        span (int): Number of steps in the viewport; defaults to the rest of the pattern
+        width (int): Number of columns
+        aggregate (str): "min", "max" or "mean" per column
+
+        Returns:
+        list: One value per column
+        """
+        length = len(self._base)
+        if not isinstance(offset, int) or not 0 <= offset < max(length, 1):
+            raise ValueError("Offset must be an integer within the pattern.")
+        if span is None:
+            span = length - offset
+        if not isinstance(span, int) or span <= 0:
+            raise ValueError("Span must be a positive integer.")
+        if not isinstance(width, int) or width <= 0:
+            raise ValueError("Width must be a positive integer.")
+        if aggregate not in AGGREGATES:
+            raise ValueError("Aggregate must be one of: " + ", ".join(AGGREGATES) + ".")
+
+        stop = min(length, offset + span)
+        per_column = -(-(stop - offset) // width)
+        field = AGGREGATES.index(aggregate)
+        values = []
+        for start in range(offset, stop, per_column):
+            value = self.summarize(start, min(stop, start + per_column))[field]
+            values.append(int(value))
+        return values
+
+def visualize_window(pattern, offset: int = 0, span: int = None, width: int = 50, aggregate: str = "max") -> str:
+    """
+    Creates an ASCII visualization of a viewport over a (long) pattern.
+
+    Pass a PatternMipmap to pan and zoom repeatedly without rebuilding the
+    summary; plain patterns are summarized on each call.
+
+    Parameters:
+    pattern: A list, Pattern, lazy pattern or PatternMipmap
+    offset (int): First step of the viewport
+    span (int): Number of steps in the viewport; defaults to the rest of the pattern
+    width (int): Number of columns (at most 50, like visualize_list)
+    aggregate (str): "min", "max" or "mean" per column
+
+    Returns:
+    str: ASCII visualization
+    """
+    if not isinstance(width, int) or not 0 < width <= mixer.VISUALIZATION_WIDTH:
+        raise ValueError("Width must be an integer between 1 and 50.")
+    mipmap = pattern if isinstance(pattern, PatternMipmap) else PatternMipmap(pattern)
+    if not len(mipmap):
+        return "Empty list"
+
+    values = mipmap.columns(offset, span, width, aggregate)
+    stop = min(len(mipmap), offset + (span if span is not None else len(mipmap)))
+    per_column = -(-(stop - offset) // width)
+    frame = mixer.visualize_list(values)
+    return frame + f"\n    Steps {offset}-{stop - 1}, {per_column} per column ({aggregate})"
@@ -0,0 +1,143 @@
+"""
+Pattern Mixing
+Overlays many patterns into one by summing them step by step with per-track gain.
+"""
+import itertools
+
+import digital_music_mixer as mixer
+from pattern_types import Pattern, like
+
+ALIGNMENTS = ("loop", "pad", "truncate")
+LEVELS = ("clip", "normalize")
+
+# Track values converted to floats at a time when mixing a 2-D block
+_MIX_BLOCK = 1 << 20
+
+def _mix_length(lengths: list, length: int, align: str) -> int:
+    """Returns the mix length: the given length, else the shortest track for truncate and the longest otherwise."""
+    if length is not None:
+        return length
+    return min(lengths) if align == "truncate" else max(lengths)
+
+def _numpy_values(track):
+    """Returns a track as a 1-D NumPy array; Patterns and arrays are not copied."""
+    np = mixer.np
+    if hasattr(track, "ndim"):
+        return track
+    if not isinstance(track, (list, Pattern)):
+        track = track.copy()
+    if isinstance(track, Pattern):
+        return np.frombuffer(track.buffer, dtype=np.uint8)
+    return np.asarray(track)
+
+def _numpy_mix(tracks, gains: list, length: int, align: str):
+    """Accumulates the weighted sum of the tracks into a float64 array."""
+    np = mixer.np
+    total = np.zeros(length)
+    if hasattr(tracks, "ndim"):
+        # One matrix-vector product per column block keeps the float copy small
+        weights = np.asarray(gains, dtype=np.float64)
+        width = min(tracks.shape[1], length)
+        step = max(1, _MIX_BLOCK // max(1, len(tracks)))
+        for start in range(0, width, step):
+            stop = min(start + step, width)
+            total[start:stop] = weights @ tracks[:, start:stop]
+        if width < length and align == "loop" and width:
+            values = total[:width].copy()
+            total[:width] = 0
+            _loop(total, values)
+        return total
+
+    for track, gain in zip(tracks, gains):
+        values = _numpy_values(track)[:length]
+        if align == "loop" and 0 < len(values) < length:
+            _loop(total, np.multiply(values, gain, dtype=np.float64))
+        else:
+            total[:len(values)] += np.multiply(values, gain, dtype=np.float64)
+    return total
+
+def _loop(total, values) -> None:
+    """Adds values to total, repeating them to its full length."""
+    size = len(values)
+    whole = len(total) // size * size
+    total[:whole].reshape(-1, size)[:] += values
+    total[whole:] += values[:len(total) - whole]
+
+def _python_mix(tracks, gains: list, length: int, align: str) -> list:
+    """Accumulates the weighted sum of the tracks into a list of floats."""
+    total = [0.0] * length
+    for track, gain in zip(tracks, gains):
+        if not isinstance(track, (list, Pattern)):
+            track = track.copy()
+        if align == "loop" and 0 < len(track) < length:
+            values = itertools.islice(itertools.cycle(track), length)
+        else:
+            values = itertools.islice(track, length)
+        for index, value in enumerate(values):
+            total[index] += gain * value
+    return total
+
+def mix_patterns(tracks, gains=None, length: int = None, align: str = "loop", level: str = "clip",
+                 backend: str = None, as_array: bool = False) -> list:
+    """
+    Mixes patterns by summing them step by step.
+
+    Tracks shorter than the mix are looped ("loop") or padded with silence
+    ("pad" and "truncate"); longer tracks are cut to the mix length.
+
+    Parameters:
+    tracks: A list of patterns or a (tracks, steps) NumPy array such as create_patterns returns
+    gains: Non-negative gain per track; defaults to 1.0 for every track
+    length (int): Length of the mix; defaults to the longest track, or the shortest for "truncate"
+    align (str): "loop", "pad" or "truncate"
+    level (str): "clip" limits the sum to 0-100; "normalize" scales it so its peak is 100
+    backend (str): "python" or "numpy"; defaults to the module backend
+    as_array (bool): With the numpy backend, return a uint8 array instead of a list
+
+    Returns:
+    list: The mixed pattern (a Pattern if the first track is stored as one)
+    """
+    if align not in ALIGNMENTS:
+        raise ValueError("Align must be one of: " + ", ".join(ALIGNMENTS) + ".")
+    if level not in LEVELS:
+        raise ValueError("Level must be one of: " + ", ".join(LEVELS) + ".")
+    if hasattr(tracks, "ndim"):
+        if tracks.ndim != 2:
+            raise ValueError("Track block must be two-dimensional.")
+        lengths = [tracks.shape[1]] * len(tracks)
+    else:
+        tracks = list(tracks)
+        for track in tracks:
+            if not isinstance(track, mixer.PATTERN_TYPES) and not hasattr(track, "ndim"):
+                raise ValueError("Tracks must be lists, Patterns, lazy patterns or arrays.")
+        lengths = [len(track) for track in tracks]
+    if not lengths:
+        raise ValueError("Tracks must contain at least one pattern.")
+    if gains is None:
+        gains = [1.0] * len(lengths)
+    gains = list(gains)
+    if len(gains) != len(lengths):
+        raise ValueError("Gains must match the number of tracks.")
+    if any(not isinstance(gain, (int, float)) or gain < 0 for gain in gains):
+        raise ValueError("Gains must be non-negative numbers.")
+    if length is not None and (not isinstance(length, int) or length < 0):
+        raise ValueError("Length must be a non-negative integer.")
+    length = _mix_length(lengths, length, align)
+
+    if mixer._resolve_backend(backend) == mixer.BACKEND_NUMPY:
+        np = mixer.np
+        total = _numpy_mix(tracks, gains, length, align)
+        if level == "normalize" and length and total.max() > 0:
+            total *= 100 / total.max()
+        result = np.clip(np.rint(total), 0, 100)
+        if as_array or hasattr(tracks, "ndim"):
+            return mixer._numpy_result(result, as_array)
+        return like(tracks[0], result.astype(np.uint8).tolist())
+
+    if hasattr(tracks, "ndim"):
+        tracks = tracks.tolist()
+    total = _python_mix(tracks, gains, length, align)
+    scale = 1.0
+    if level == "normalize" and length and max(total) > 0:
+        scale = 100 / max(total)
+    return like(tracks[0], (min(100, max(0, round(value * scale))) for value in total))
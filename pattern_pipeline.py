@@ -0,0 +1,313 @@
+"""
+Pattern Pipeline
+Composable transformations over chunked pattern streams.
+"""
+import itertools
+import mmap
+import tempfile
+
+import digital_music_mixer as mixer
+
+DEFAULT_CHUNK_SIZE = 65536
+
+# Feistel rounds of the segment permutation used by shuffle_segments
+PERMUTATION_ROUNDS = 6
+_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+def _to_bytes(chunk) -> bytes:
+    """Converts a chunk (list, Pattern, view or NumPy array) to uint8 bytes."""
+    if hasattr(chunk, "astype"):
+        return chunk.astype("uint8").tobytes()
+    return bytes(chunk)
+
+class _Spill:
+    """A temporary file holding a finite stream as raw uint8 samples, read back through mmap."""
+
+    def __init__(self, chunks):
+        self.file = tempfile.TemporaryFile()
+        self.length = 0
+        for chunk in chunks:
+            data = _to_bytes(chunk)
+            self.file.write(data)
+            self.length += len(data)
+        self.file.flush()
+        self._map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.length else b""
+
+    def read(self, offset: int, size: int) -> list:
+        """Reads size samples starting at offset."""
+        return list(self._map[offset:offset + size])
+
+    def gather(self, offsets, size: int) -> list:
+        """Reads the size samples at each of a NumPy array of offsets, in order, with one fancy index."""
+        np = mixer.np
+        index = (offsets[:, None] + np.arange(size, dtype=offsets.dtype)).ravel()
+        index = index[index < self.length]
+        return np.frombuffer(self._map, dtype=np.uint8)[index].tolist()
+
+    def chunks(self, chunk_size: int):
+        """Yields the stored samples in chunks of chunk_size."""
+        for offset in range(0, self.length, chunk_size):
+            yield self.read(offset, chunk_size)
+
+    def close(self) -> None:
+        """Unmaps and deletes the spill file."""
+        if self.length:
+            self._map.close()
+        self.file.close()
+
+class _SegmentPermutation:
+    """
+    A keyed pseudo-random bijection on range(count) using O(1) memory.
+
+    A balanced Feistel network permutes the smallest even-bit domain that
+    holds count; values that land outside range(count) are fed through it
+    again (cycle walking) until they fall inside, which keeps it a
+    bijection. Unlike shuffling a list of offsets, the state is just the
+    round keys, however many segments there are.
+    """
+
+    def __init__(self, count: int, rng):
+        self.count = count
+        self._half = (max(2, (count - 1).bit_length()) + 1) // 2
+        self._low = (1 << self._half) - 1
+        random = mixer._python_rng(rng)
+        self._keys = [random.getrandbits(64) for _ in range(PERMUTATION_ROUNDS)]
+
+    def __getitem__(self, index: int) -> int:
+        half, low, keys = self._half, self._low, self._keys
+        value = index
+        while True:
+            left, right = value >> half, value & low
+            for key in keys:
+                left, right = right, left ^ (((right ^ key) * _MULTIPLIER & _MASK64) >> 32 & low)
+            value = left << half | right
+            if value < self.count:
+                return value
+
+    def _numpy_feistel(self, values):
+        """Applies the Feistel rounds to a uint64 array of segment numbers."""
+        np = mixer.np
+        half, low = np.uint64(self._half), np.uint64(self._low)
+        left, right = values >> half, values & low
+        with np.errstate(over="ignore"):
+            for key in self._keys:
+                mixed = ((right ^ np.uint64(key)) * np.uint64(_MULTIPLIER)) >> np.uint64(32) & low
+                left, right = right, left ^ mixed
+        return left << half | right
+
+    def take(self, start: int, stop: int):
+        """Returns the permuted values of start..stop - 1 as a NumPy uint64 array."""
+        np = mixer.np
+        values = self._numpy_feistel(np.arange(start, stop, dtype=np.uint64))
+        pending = np.flatnonzero(values >= self.count)
+        while len(pending):
+            values[pending] = self._numpy_feistel(values[pending])
+            pending = pending[values[pending] >= self.count]
+        return values
+
+def _slice_stage(chunks, start: int, end: int, step: int):
+    """Applies [start:end:step] (non-negative bounds, positive step) to a chunk stream."""
+    if end is not None and end <= start:
+        return
+    position = 0
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        first = max(start, position)
+        first += -(first - start) % step
+        stop = chunk_end if end is None else min(end, chunk_end)
+        if first < stop:
+            yield chunk[first - position:stop - position:step]
+        position = chunk_end
+        # Stop before pulling a chunk past the end, which an endless source would have to generate
+        if end is not None and position >= end:
+            return
+
+def _repeat_stage(chunks, repeats: int, chunk_size: int):
+    """Yields the stream repeats times, replaying later passes from a spill file."""
+    spill = None
+    try:
+        spill = _Spill(chunks)
+        for _ in range(repeats):
+            yield from spill.chunks(chunk_size)
+    finally:
+        if spill is not None:
+            spill.close()
+
+def _shuffle_stage(chunks, segment_size: int, chunk_size: int, rng, backend: str):
+    """Shuffles fixed-size segments of a finite stream through a spill file, one output chunk at a time."""
+    spill = None
+    try:
+        spill = _Spill(chunks)
+        count = -(-spill.length // segment_size)
+        order = _SegmentPermutation(count, rng)
+        if segment_size >= chunk_size:
+            # Large segments are copied out in chunk-sized pieces
+            for index in range(count):
+                offset = order[index] * segment_size
+                end = min(offset + segment_size, spill.length)
+                for piece in range(offset, end, chunk_size):
+                    yield spill.read(piece, min(chunk_size, end - piece))
+            return
+
+        group = chunk_size // segment_size
+        numpy_backend = mixer._resolve_backend(backend) == mixer.BACKEND_NUMPY
+        for first in range(0, count, group):
+            last = min(first + group, count)
+            if numpy_backend:
+                yield spill.gather(order.take(first, last) * mixer.np.uint64(segment_size), segment_size)
+            else:
+                buffer = []
+                for index in range(first, last):
+                    buffer.extend(spill.read(order[index] * segment_size, segment_size))
+                yield buffer
+    finally:
+        if spill is not None:
+            spill.close()
+
+def _rechunk_stage(chunks, chunk_size: int):
+    """Regroups a stream into chunks of exactly chunk_size (except the last)."""
+    buffer = []
+    for chunk in chunks:
+        buffer.extend(chunk)
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            del buffer[:chunk_size]
+    if buffer:
+        yield buffer
+
+class Pipeline:
+    """
+    A lazy chain of transformations over a chunked pattern stream.
+
+    Each stage pulls bounded-size chunks from the previous one, so at most
+    a few chunks are held in memory at a time. Stages that need the whole
+    stream (repeat and shuffle_segments) spill it to a temporary file
+    instead of memory and therefore need a finite input; slice with an
+    end makes an endless stream finite. A pipeline can be iterated once.
+    """
+
+    def __init__(self, chunks, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer.")
+        self._chunks = iter(chunks)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_pattern(cls, pattern, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "Pipeline":
+        """
+        Creates a pipeline reading an in-memory pattern in chunks.
+
+        Parameters:
+        pattern: A list, Pattern or lazy pattern
+        chunk_size (int): Number of values per chunk
+
+        Returns:
+        Pipeline: A pipeline over the pattern
+        """
+        if not isinstance(pattern, mixer.PATTERN_TYPES):
+            raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer.")
+        chunks = (pattern[offset:offset + chunk_size] for offset in range(0, len(pattern), chunk_size))
+        return cls(chunks, chunk_size)
+
+    @classmethod
+    def from_generator(cls, kind: str, length: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       backend: str = None, rng=None) -> "Pipeline":
+        """
+        Creates a pipeline over a streaming pattern generator.
+
+        Parameters:
+        kind (str): One of "bass", "melody", "percussion" or "ambient"
+        length (int): Total number of values; endless if omitted
+        chunk_size (int): Number of values per chunk
+        backend (str): "python" or "numpy"
+        rng: Integer seed, random.Random or numpy Generator
+
+        Returns:
+        Pipeline: A pipeline over the generated stream
+        """
+        if length is not None and (not isinstance(length, int) or length <= 0):
+            raise ValueError("Length must be a positive integer.")
+        pipeline = cls(mixer.stream_pattern(kind, chunk_size, backend, rng=rng), chunk_size)
+        if length is not None:
+            pipeline = pipeline.slice(0, length)
+        return pipeline
+
+    def _then(self, chunks) -> "Pipeline":
+        return Pipeline(chunks, self.chunk_size)
+
+    def slice(self, start: int = 0, end: int = None, step: int = 1) -> "Pipeline":
+        """Keeps values [start:end:step]; bounds must be non-negative and step positive."""
+        if not isinstance(start, int) or start < 0:
+            raise ValueError("Start must be a non-negative integer.")
+        if end is not None and (not isinstance(end, int) or end < 0):
+            raise ValueError("End must be a non-negative integer.")
+        if not isinstance(step, int) or step <= 0:
+            raise ValueError("Step must be a positive integer.")
+        return self._then(_slice_stage(self._chunks, start, end, step))
+
+    def repeat(self, repeats: int) -> "Pipeline":
+        """Repeats the (finite) stream, like pattern * repeats."""
+        if not isinstance(repeats, int) or repeats <= 0:
+            raise ValueError("Repeats must be a positive integer.")
+        if repeats == 1:
+            return self
+        return self._then(_repeat_stage(self._chunks, repeats, self.chunk_size))
+
+    def concat(self, *others) -> "Pipeline":
+        """Appends other pipelines or chunk iterables, like pattern1 + pattern2."""
+        return self._then(itertools.chain(self._chunks, *others))
+
+    def shuffle_segments(self, segment_size: int, rng=None, backend: str = None) -> "Pipeline":
+        """
+        Shuffles segments of the (finite) stream while keeping each segment intact.
+
+        The order comes from a seeded permutation computed on the fly, so
+        memory stays at about one chunk whatever the number of segments.
+        It differs from the order shuffle_segments gives for the same seed.
+        With the python backend, time grows with the number of segments;
+        the numpy backend permutes and copies a whole chunk of segments at
+        once, so small segment sizes stay fast.
+
+        Parameters:
+        segment_size (int): Number of values per segment
+        rng: Integer seed, random.Random or numpy Generator
+        backend (str): "python" or "numpy"; defaults to the module backend
+        """
+        if not isinstance(segment_size, int) or segment_size <= 0:
+            raise ValueError("Segment size must be a positive integer.")
+        return self._then(_shuffle_stage(self._chunks, segment_size, self.chunk_size, rng, backend))
+
+    def rechunk(self, chunk_size: int = None) -> "Pipeline":
+        """Regroups the stream into equally sized chunks."""
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer.")
+        return Pipeline(_rechunk_stage(self._chunks, chunk_size), chunk_size)
+
+    def __iter__(self):
+        return self._chunks
+
+    def collect(self) -> list:
+        """Runs the pipeline and returns all values as one list."""
+        result = []
+        for chunk in self._chunks:
+            result.extend(chunk)
+        return result
+
+    def write_to(self, file) -> int:
+        """
+        Runs the pipeline, writing values as uint8 bytes to a binary file.
+
+        Returns:
+        int: Number of values written
+        """
+        written = 0
+        for chunk in self._chunks:
+            data = _to_bytes(chunk)
+            file.write(data)
+            written += len(data)
+        return written
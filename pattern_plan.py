@@ -0,0 +1,227 @@
+"""
+Transformation Plans
+Lazy, self-simplifying chains of list transformations executed in one pass.
+
+A plan describes its result as a short list of segments, each an index
+range over one source pattern repeated some number of times. Every
+transformation rewrites the segments instead of copying data, which
+simplifies chains algebraically as they are built: a double reversal
+restores the original ranges, slices of slices compose into one stride,
+slices of repetitions keep only the copies they touch, and adjacent
+ranges are merged. execute() then reads the source data once.
+"""
+import bisect
+
+import digital_music_mixer as mixer
+from pattern_types import Pattern, PatternView, RepeatedPattern, _as_slice, like
+
+def _append(segments: list, source, indices: range, repeats: int = 1) -> None:
+    """Appends a segment, merging it into the previous one where possible."""
+    if not indices or not repeats:
+        return
+    if segments:
+        last_source, last, last_repeats = segments[-1]
+        if last_source is source:
+            if last == indices:
+                segments[-1] = (source, last, last_repeats + repeats)
+                return
+            if (repeats == last_repeats == 1 and last.step == indices.step and
+                    last[-1] + last.step == indices[0]):
+                merged = range(last.start, indices[-1] + indices.step, indices.step)
+                segments[-1] = (source, merged, 1)
+                return
+    segments.append((source, indices, repeats))
+
+def _pick(segments: list, source, indices: range, repeats: int, first: int, last: int, step: int) -> None:
+    """Appends positions first, first + step, ... <= last of indices repeated repeats times."""
+    length = len(indices)
+    copy = first // length
+    if repeats == 1 or copy == last // length:
+        offset = copy * length
+        _append(segments, source, indices[first - offset:last - offset + 1:step])
+        return
+    position = first
+    while position <= last:
+        copy = position // length
+        offset = copy * length
+        end = min(offset + length - 1, last)
+        _append(segments, source, indices[position - offset:end - offset + 1:step])
+        position += ((end - position) // step + 1) * step
+        offset = position // length * length
+        if length % step == 0 and offset + length - 1 <= last:
+            # Every whole copy from here on picks the same positions
+            full = (last + 1 - offset) // length
+            _append(segments, source, indices[position - offset::step], full)
+            position += full * length
+
+def _select(segments: list, starts: list, positions: range) -> list:
+    """Returns the segments covering positions (a range over the concatenated segments)."""
+    if not positions:
+        return []
+    if positions.step < 0:
+        return _reverse(_select(segments, starts, positions[::-1]))
+    result = []
+    position, last, step = positions.start, positions[-1], positions.step
+    index = bisect.bisect_right(starts, position) - 1
+    while index < len(segments) and position <= last:
+        source, indices, repeats = segments[index]
+        offset = starts[index]
+        end = min(last, offset + len(indices) * repeats - 1)
+        _pick(result, source, indices, repeats, position - offset, end - offset, step)
+        position += ((end - position) // step + 1) * step
+        index = bisect.bisect_right(starts, position) - 1
+    return result
+
+def _reverse(segments: list) -> list:
+    """Returns the segments of the reversed sequence."""
+    result = []
+    for source, indices, repeats in reversed(segments):
+        _append(result, source, indices[::-1], repeats)
+    return result
+
+def _starts(segments: list) -> list:
+    """Returns each segment's first position in the concatenated sequence."""
+    starts, total = [], 0
+    for _, indices, repeats in segments:
+        starts.append(total)
+        total += len(indices) * repeats
+    return starts
+
+def _segments_of(pattern) -> list:
+    """Describes a list, Pattern or lazy pattern as segments over its stored data."""
+    if isinstance(pattern, (list, Pattern)):
+        return [(pattern, range(len(pattern)), 1)] if len(pattern) else []
+    if isinstance(pattern, PatternView):
+        base = _segments_of(pattern.base)
+        return _select(base, _starts(base), pattern._indices)
+    if isinstance(pattern, RepeatedPattern):
+        return _repeat(_segments_of(pattern.base), pattern.repeats)
+    segments = []
+    for leaf in pattern.leaves():
+        for segment in _segments_of(leaf):
+            _append(segments, *segment)
+    return segments
+
+def _repeat(segments: list, repeats: int) -> list:
+    """Returns the segments of the sequence repeated repeats times."""
+    if len(segments) == 1:
+        source, indices, count = segments[0]
+        return [(source, indices, count * repeats)]
+    result = []
+    for _ in range(repeats):
+        for segment in segments:
+            _append(result, *segment)
+    return result
+
+class TransformPlan:
+    """
+    A lazy chain of reverse, slice, extend, combine and shuffle steps.
+
+    Each method returns a new plan and takes the same arguments as the
+    matching digital_music_mixer function; nothing is copied until
+    execute(). Plan size grows with the number of distinct pieces in the
+    result (e.g. shuffled segments), not with its length.
+    """
+    __slots__ = ("_source", "_segments", "_starts")
+
+    def __init__(self, pattern):
+        if not isinstance(pattern, mixer.PATTERN_TYPES):
+            raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+        self._source = pattern
+        self._segments = _segments_of(pattern)
+        self._starts = _starts(self._segments)
+
+    def _then(self, segments: list) -> "TransformPlan":
+        plan = TransformPlan.__new__(TransformPlan)
+        plan._source = self._source
+        plan._segments = segments
+        plan._starts = _starts(segments)
+        return plan
+
+    def __len__(self) -> int:
+        if not self._segments:
+            return 0
+        _, indices, repeats = self._segments[-1]
+        return self._starts[-1] + len(indices) * repeats
+
+    @property
+    def segments(self) -> list:
+        """The simplified plan as (source, index range, repeats) triples."""
+        return list(self._segments)
+
+    def reverse(self) -> "TransformPlan":
+        """Plans list[::-1]."""
+        return self._then(_reverse(self._segments))
+
+    def slice(self, start: int = 0, end: int = None, step: int = 1) -> "TransformPlan":
+        """Plans list[start:end:step] with the same rules as slice_list."""
+        if not isinstance(start, int):
+            raise ValueError("Start must be an integer.")
+        if end is not None and not isinstance(end, int):
+            raise ValueError("End must be an integer.")
+        if not isinstance(step, int) or step == 0:
+            raise ValueError("Step must be a non-zero integer.")
+        if end is None:
+            end = len(self)
+        return self._then(_select(self._segments, self._starts, range(len(self))[start:end:step]))
+
+    def extend(self, repeats: int) -> "TransformPlan":
+        """Plans list * repeats."""
+        if not isinstance(repeats, int) or repeats <= 0:
+            raise ValueError("Repeats must be a positive integer.")
+        return self._then(_repeat(self._segments, repeats))
+
+    def combine(self, other) -> "TransformPlan":
+        """Plans list1 + list2; other may be a pattern or another plan."""
+        if isinstance(other, TransformPlan):
+            other_segments = other._segments
+        elif isinstance(other, mixer.PATTERN_TYPES):
+            other_segments = _segments_of(other)
+        else:
+            raise ValueError("Pattern2 must be a list, Pattern, lazy pattern or plan.")
+        segments = list(self._segments)
+        for segment in other_segments:
+            _append(segments, *segment)
+        return self._then(segments)
+
+    def shuffle(self, segment_size: int, rng=None) -> "TransformPlan":
+        """
+        Plans shuffle_segments; the order is drawn now, so the same rng
+        gives the same result as shuffle_segments.
+        """
+        if not isinstance(segment_size, int) or segment_size <= 0:
+            raise ValueError("Segment size must be a positive integer.")
+        length = len(self)
+        offsets = list(range(0, length, segment_size))
+        mixer._python_rng(rng).shuffle(offsets)
+        segments = []
+        for offset in offsets:
+            positions = range(offset, min(offset + segment_size, length))
+            for segment in _select(self._segments, self._starts, positions):
+                _append(segments, *segment)
+        return self._then(segments)
+
+    def execute(self):
+        """
+        Runs the plan in a single pass over the source data.
+
+        Returns:
+        A list, or a Pattern when the plan's first pattern is stored as one
+        """
+        values = []
+        for source, indices, repeats in self._segments:
+            piece = source[_as_slice(indices)]
+            values.extend(piece * repeats if repeats > 1 else piece)
+        return like(self._source, values)
+
+def plan(pattern) -> TransformPlan:
+    """
+    Starts a transformation plan over a pattern.
+
+    Parameters:
+    pattern: A list, Pattern or lazy pattern
+
+    Returns:
+    TransformPlan: An empty plan whose result is pattern itself
+    """
+    return TransformPlan(pattern)
@@ -0,0 +1,228 @@
+"""
+Pattern Player
+Plays patterns step by step in real time with an asyncio scheduler.
+
+Steps are sent to a sink: any object with a write(event) method (which
+may be a coroutine) and an optional close(). Steps are scheduled against
+absolute deadlines, so a late step does not delay the ones after it.
+"""
+import asyncio
+import errno
+import inspect
+import math
+import os
+import threading
+from collections import namedtuple
+
+from pattern_types import Pattern, PatternView, RepeatedPattern, Rope
+
+StepEvent = namedtuple("StepEvent", ["time", "step", "position", "value"])
+StepEvent.__doc__ = """One played step: scheduled time in seconds since start, global step
+number, position within the playing pattern and its amplitude."""
+
+_PATTERN_TYPES = (list, Pattern, PatternView, RepeatedPattern, Rope)
+
+# Seconds stop() waits for the playback thread, which may be blocked writing to a stalled pipe
+STOP_TIMEOUT = 1.0
+
+class FileSink:
+    """
+    Writes one "time step value" line per step to a file or named pipe.
+
+    The file is opened without blocking: while a FIFO has no reader, steps
+    are dropped (and counted in dropped) and the open is retried on the
+    next step, so playback never waits for a reader to appear.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dropped = 0
+        self._file = None
+
+    def _open(self) -> bool:
+        """Opens the path if possible; returns False while a FIFO has no reader."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NONBLOCK", 0)
+        try:
+            descriptor = os.open(self.path, flags, 0o666)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                return False
+            raise
+        os.set_blocking(descriptor, True)
+        self._file = open(descriptor, "w", buffering=1, encoding="utf-8")
+        return True
+
+    def write(self, event: StepEvent) -> None:
+        if self._file is None and not self._open():
+            self.dropped += 1
+            return
+        self._file.write(f"{event.time:.6f} {event.step} {event.value}\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class StreamSink:
+    """Writes step lines to an already open text stream (e.g. a pipe's stdin); the stream is left open."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, event: StepEvent) -> None:
+        self.stream.write(f"{event.time:.6f} {event.step} {event.value}\n")
+        self.stream.flush()
+
+class MemorySink:
+    """A stand-in output device that records every event it receives."""
+
+    def __init__(self):
+        self.events = []
+
+    def write(self, event: StepEvent) -> None:
+        self.events.append(event)
+
+class JitterStats:
+    """Running statistics of how late steps were emitted, in seconds (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.maximum = 0.0
+        self._squares = 0.0
+
+    def add(self, lateness: float) -> None:
+        self.count += 1
+        delta = lateness - self.mean
+        self.mean += delta / self.count
+        self._squares += delta * (lateness - self.mean)
+        self.maximum = max(self.maximum, lateness)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self._squares / self.count) if self.count else 0.0
+
+    def summary(self) -> dict:
+        """Returns count, mean, stdev and max lateness in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.mean * 1000,
+            "stdev_ms": self.stdev * 1000,
+            "max_ms": self.maximum * 1000,
+        }
+
+class PatternPlayer:
+    """
+    Loops a pattern at a fixed tempo, sending each step to a sink.
+
+    swap() double-buffers the next pattern: it is queued, and the player
+    switches to it at the start of the next bar, from its first step, so
+    edits never cut a bar short. The first pattern starts right away.
+    Use run() inside an event loop, or start() and stop() to play from a
+    background thread.
+    """
+
+    def __init__(self, sink, pattern=None, bpm: float = 120, steps_per_beat: int = 4, steps_per_bar: int = 16):
+        if not isinstance(bpm, (int, float)) or bpm <= 0:
+            raise ValueError("BPM must be a positive number.")
+        if not isinstance(steps_per_beat, int) or steps_per_beat <= 0:
+            raise ValueError("Steps per beat must be a positive integer.")
+        if not isinstance(steps_per_bar, int) or steps_per_bar <= 0:
+            raise ValueError("Steps per bar must be a positive integer.")
+        self.sink = sink
+        self.steps_per_bar = steps_per_bar
+        self.jitter = JitterStats()
+        self._step_time = 60 / (bpm * steps_per_beat)
+        self._current = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        if pattern is not None:
+            self.swap(pattern)
+
+    @property
+    def pattern(self):
+        """The pattern that will be playing after the next bar line."""
+        with self._lock:
+            return self._pending if self._pending is not None else self._current
+
+    def swap(self, pattern) -> None:
+        """Queues a pattern to start playing at the next bar."""
+        if not isinstance(pattern, _PATTERN_TYPES):
+            raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+        with self._lock:
+            self._pending = pattern
+
+    def _next_value(self, step: int, position: int) -> tuple:
+        """Returns (position, value) for a step, switching patterns on bar lines or when silent."""
+        if step % self.steps_per_bar == 0 or self._current is None:
+            with self._lock:
+                if self._pending is not None:
+                    self._current, self._pending = self._pending, None
+                    position = 0
+        if not self._current:
+            return 0, None
+        position %= len(self._current)
+        return position, self._current[position]
+
+    async def run(self, steps: int = None) -> JitterStats:
+        """
+        Plays until stop() is called or steps steps have been scheduled.
+
+        Steps before the first pattern arrives are silent and not sent.
+
+        Returns:
+        JitterStats: Lateness of every emitted step
+        """
+        self._running = True
+        return await self._play(steps)
+
+    async def _play(self, steps: int = None) -> JitterStats:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        step = position = 0
+        try:
+            while self._running and (steps is None or step < steps):
+                deadline = start + step * self._step_time
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                lateness = loop.time() - deadline
+                position, value = self._next_value(step, position)
+                if value is not None:
+                    self.jitter.add(max(0.0, lateness))
+                    result = self.sink.write(StepEvent(step * self._step_time, step, position, value))
+                    if inspect.isawaitable(result):
+                        await result
+                    position += 1
+                step += 1
+        finally:
+            self._running = False
+            close = getattr(self.sink, "close", None)
+            if close is not None:
+                close()
+        return self.jitter
+
+    def start(self) -> None:
+        """Starts playing in a background thread with its own event loop."""
+        if self._thread is not None and self._thread.is_alive():
+            raise ValueError("Player is already running.")
+        self._running = True
+        self._thread = threading.Thread(target=asyncio.run, args=(self._play(),), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        """
+        Stops playback after the current step and waits up to timeout seconds for the background thread.
+
+        A thread still blocked in its sink after the timeout is left to
+        finish on its own; it is a daemon thread, so it does not keep the
+        program alive.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
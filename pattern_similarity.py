@@ -0,0 +1,219 @@
+"""
+Pattern Similarity
+Approximate nearest-neighbour search over patterns using locality-sensitive hashing.
+
+Each pattern is reduced to a fixed-length embedding (its amplitude envelope
+averaged into EMBEDDING_SIZE bins) so patterns of any length can be compared.
+Embeddings are hashed by quantized random projections into several tables; a query
+only ranks the patterns sharing a bucket with it, so lookups stay sub-linear
+as the index grows.
+"""
+import struct
+
+import digital_music_mixer as mixer
+
+EMBEDDING_SIZE = 32
+
+def embed(pattern, size: int = EMBEDDING_SIZE) -> list:
+    """
+    Computes a pattern's fixed-length feature embedding.
+
+    Parameters:
+    pattern: A list, Pattern or lazy pattern
+    size (int): Number of envelope bins
+
+    Returns:
+    list: Bin means scaled to -0.5..0.5
+    """
+    if not isinstance(pattern, mixer.PATTERN_TYPES):
+        raise ValueError("Pattern must be a list, Pattern or lazy pattern.")
+    length = len(pattern)
+    if not length:
+        return [-0.5] * size
+    values = pattern if isinstance(pattern, (list, mixer.Pattern)) else pattern.copy()
+    embedding = []
+    for index in range(size):
+        low = index * length // size
+        high = max(low + 1, (index + 1) * length // size)
+        embedding.append(sum(values[low:high]) / (high - low) / 100 - 0.5)
+    return embedding
+
+def embed_block(block, size: int = EMBEDDING_SIZE):
+    """
+    Computes embeddings for every row of a (count, length) NumPy block at once.
+
+    Returns:
+    numpy.ndarray: A (count, size) float array matching embed() row by row
+    """
+    np = mixer.np
+    count, length = block.shape
+    if not length:
+        return np.full((count, size), -0.5)
+    starts = np.arange(size) * length // size
+    if length >= size:
+        widths = np.diff(starts, append=length)
+        sums = np.add.reduceat(block.astype(np.float64), starts, axis=1)
+        return sums / widths / 100 - 0.5
+    return block[:, starts].astype(np.float64) / 100 - 0.5
+
+class SimilarityIndex:
+    """
+    A p-stable LSH index over pattern embeddings.
+
+    Each table hashes an embedding by projecting it onto hashes random
+    directions and cutting each projection into buckets of the given width,
+    so nearby embeddings tend to land in the same bucket. More tables find
+    more true neighbours; more hashes per table make buckets smaller and
+    queries faster. Results are approximate: a neighbour that shares no
+    bucket with the query is not returned.
+    """
+
+    def __init__(self, tables: int = 8, hashes: int = 6, width: float = 0.5,
+                 size: int = EMBEDDING_SIZE, seed=0):
+        for name, value in (("Tables", tables), ("Hashes", hashes), ("Size", size)):
+            if not isinstance(value, int) or value <= 0:
+                raise ValueError(f"{name} must be a positive integer.")
+        if not isinstance(width, (int, float)) or width <= 0:
+            raise ValueError("Width must be a positive number.")
+        rand = mixer._python_rng(seed)
+        self.size = size
+        self._hashes = hashes
+        self._width = width
+        self._directions = [[rand.gauss(0, 1) for _ in range(size)] for _ in range(tables * hashes)]
+        self._offsets = [rand.uniform(0, width) for _ in range(tables * hashes)]
+        self._buckets = [{} for _ in range(tables)]
+        self._keys = []
+        self._vectors = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _signatures(self, vectors) -> list:
+        """Returns one list of per-table bucket codes (packed cell numbers) for each embedding."""
+        tables = len(self._buckets)
+        if mixer.np is not None:
+            np = mixer.np
+            projections = vectors @ np.asarray(self._directions).T
+            cells = np.floor((projections + self._offsets) / self._width).astype("<i4")
+            return cells.view(f"V{4 * self._hashes}").reshape(len(cells), tables).tolist()
+        signatures = []
+        for vector in vectors:
+            cells = [
+                int((sum(d * v for d, v in zip(direction, vector)) + offset) // self._width)
+                for direction, offset in zip(self._directions, self._offsets)
+            ]
+            signatures.append([
+                struct.pack(f"<{self._hashes}i", *cells[table * self._hashes:(table + 1) * self._hashes])
+                for table in range(tables)
+            ])
+        return signatures
+
+    def _embed_many(self, patterns):
+        """Embeds patterns as a NumPy array when available, else as a list of lists."""
+        if hasattr(patterns, "ndim"):
+            if patterns.ndim != 2:
+                raise ValueError("Block must be two-dimensional.")
+            if mixer.np is not None:
+                return embed_block(patterns, self.size)
+            patterns = patterns.tolist()
+        vectors = [embed(pattern, self.size) for pattern in patterns]
+        if mixer.np is not None:
+            return mixer.np.asarray(vectors, dtype=mixer.np.float64).reshape(-1, self.size)
+        return vectors
+
+    def add(self, pattern, key=None):
+        """
+        Adds one pattern.
+
+        Parameters:
+        pattern: A list, Pattern or lazy pattern
+        key: Identifier returned by queries, e.g. a PatternLibrary id; defaults to the insertion position
+
+        Returns:
+        The pattern's key
+        """
+        return self.add_many([pattern], None if key is None else [key])[0]
+
+    def add_many(self, patterns, keys=None) -> list:
+        """
+        Adds many patterns, hashing them in one batch.
+
+        Parameters:
+        patterns: Iterable of patterns or a (count, length) NumPy array
+        keys: Optional identifiers, one per pattern
+
+        Returns:
+        list: The patterns' keys
+        """
+        vectors = self._embed_many(patterns)
+        if keys is None:
+            keys = range(len(self._keys), len(self._keys) + len(vectors))
+        keys = list(keys)
+        if len(keys) != len(vectors):
+            raise ValueError("Keys must match the number of patterns.")
+        first = len(self._keys)
+        for row, codes in enumerate(self._signatures(vectors), first):
+            for buckets, code in zip(self._buckets, codes):
+                buckets.setdefault(code, []).append(row)
+        self._keys.extend(keys)
+        self._vectors.append(vectors)
+        return keys
+
+    def _stored_vectors(self):
+        """Returns all stored embeddings, merging the blocks added since the last call."""
+        if len(self._vectors) > 1:
+            if mixer.np is not None:
+                merged = mixer.np.concatenate(self._vectors)
+            else:
+                merged = [vector for block in self._vectors for vector in block]
+            self._vectors = [merged]
+        return self._vectors[0]
+
+    def _rank(self, vector, candidates: set, k: int) -> list:
+        """Returns the k closest candidates as (key, distance) pairs."""
+        if not candidates:
+            return []
+        rows = sorted(candidates)
+        stored = self._stored_vectors()
+        if mixer.np is not None:
+            np = mixer.np
+            distances = np.sqrt(((stored[rows] - np.asarray(vector)) ** 2).sum(axis=1)).tolist()
+        else:
+            distances = [sum((a - b) ** 2 for a, b in zip(stored[row], vector)) ** 0.5 for row in rows]
+        ranked = sorted(zip(distances, rows))[:k]
+        return [(self._keys[row], distance) for distance, row in ranked]
+
+    def query(self, pattern, k: int = 5) -> list:
+        """
+        Finds the stored patterns most similar to a pattern.
+
+        Parameters:
+        pattern: A list, Pattern or lazy pattern
+        k (int): Maximum number of results
+
+        Returns:
+        list: Up to k (key, distance) pairs, closest first
+        """
+        return self.query_many([pattern], k)[0]
+
+    def query_many(self, patterns, k: int = 5) -> list:
+        """
+        Runs one query per pattern, embedding and hashing them in one batch.
+
+        Parameters:
+        patterns: Iterable of patterns or a (count, length) NumPy array
+        k (int): Maximum number of results per query
+
+        Returns:
+        list: One result list per pattern, as returned by query()
+        """
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("K must be a positive integer.")
+        vectors = self._embed_many(patterns)
+        results = []
+        for vector, codes in zip(vectors, self._signatures(vectors)):
+            candidates = set()
+            for buckets, code in zip(self._buckets, codes):
+                candidates.update(buckets.get(code, ()))
+            results.append(self._rank(vector, candidates, k))
+        return results
@@ -0,0 +1,661 @@
+"""
+Pattern Types
+Compact sequence types for amplitude patterns (values 0-100).
+"""
+from array import array
+from itertools import chain, repeat
+
+MIN_AMPLITUDE = 0
+MAX_AMPLITUDE = 100
+
+def _to_array(values) -> array:
+    """Copies values into a new array('B'), validating the amplitude range."""
+    if isinstance(values, Pattern):
+        return array("B", values._data)
+    try:
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            data = array("B", bytes(values))
+        else:
+            data = array("B", values)
+    except (TypeError, OverflowError):
+        raise ValueError("Pattern values must be integers in the range 0-100.") from None
+    if data and max(data) > MAX_AMPLITUDE:
+        raise ValueError("Pattern values must be integers in the range 0-100.")
+    return data
+
+def check_array(values) -> None:
+    """Checks that a NumPy array holds integers in the range 0-100, before it is cast to uint8."""
+    if values.dtype.kind not in "iub" or (values.size and not 0 <= values.min() <= values.max() <= MAX_AMPLITUDE):
+        raise ValueError("Pattern values must be integers in the range 0-100.")
+
+def pattern_bytes(pattern) -> bytes:
+    """
+    Returns a pattern's samples as uint8 bytes, validating the amplitude range.
+
+    Parameters:
+    pattern: A list, Pattern, lazy pattern or NumPy array (of any shape)
+
+    Returns:
+    bytes: One byte per step
+    """
+    if isinstance(pattern, Pattern):
+        return pattern.tobytes()
+    if hasattr(pattern, "astype"):
+        check_array(pattern)
+        return pattern.astype("uint8").tobytes()
+    try:
+        data = bytes(pattern)
+    except (TypeError, ValueError):
+        raise ValueError("Pattern values must be integers in the range 0-100.") from None
+    if data and max(data) > MAX_AMPLITUDE:
+        raise ValueError("Pattern values must be integers in the range 0-100.")
+    return data
+
+class Pattern:
+    """
+    An amplitude pattern stored as one byte per step.
+
+    Supports the list operations used throughout the mixer: indexing,
+    slicing with any step (pattern[start:end:step]), reversal
+    (pattern[::-1]), repetition (pattern * n) and concatenation
+    (pattern1 + pattern2, also with plain lists). Values are unboxed in
+    an array('B'), so a pattern takes about one byte per step instead of
+    an eight-byte pointer per list item, and buffer exposes the samples
+    without copying.
+    """
+    __slots__ = ("_data",)
+
+    def __init__(self, values=()):
+        self._data = _to_array(values)
+
+    @classmethod
+    def _wrap(cls, data: array) -> "Pattern":
+        """Wraps an already validated array without copying it."""
+        pattern = cls.__new__(cls)
+        pattern._data = data
+        return pattern
+
+    @property
+    def buffer(self) -> memoryview:
+        """Zero-copy read/write view of the samples."""
+        return memoryview(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Pattern._wrap(self._data[index])
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._data[index] = _to_array(value)
+        else:
+            if not isinstance(value, int) or not MIN_AMPLITUDE <= value <= MAX_AMPLITUDE:
+                raise ValueError("Pattern values must be integers in the range 0-100.")
+            self._data[index] = value
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    def __contains__(self, value) -> bool:
+        return value in self._data
+
+    def __add__(self, other):
+        if isinstance(other, Pattern):
+            return Pattern._wrap(self._data + other._data)
+        if isinstance(other, list):
+            return Pattern._wrap(self._data + _to_array(other))
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return Pattern._wrap(_to_array(other) + self._data)
+        return NotImplemented
+
+    def __mul__(self, repeats):
+        if not isinstance(repeats, int):
+            return NotImplemented
+        return Pattern._wrap(self._data * repeats)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Pattern):
+            return self._data == other._data
+        if isinstance(other, list):
+            return self._data.tolist() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Pattern({self._data.tolist()!r})"
+
+    def count(self, value: int) -> int:
+        """Returns the number of steps equal to value."""
+        return self._data.count(value)
+
+    def index(self, value: int) -> int:
+        """Returns the first position of value."""
+        return self._data.index(value)
+
+    def copy(self) -> "Pattern":
+        """Returns an independent copy of the pattern."""
+        return Pattern._wrap(array("B", self._data))
+
+    def tolist(self) -> list:
+        """Returns the pattern as a list of integers."""
+        return self._data.tolist()
+
+    def tobytes(self) -> bytes:
+        """Returns the pattern as raw uint8 samples."""
+        return self._data.tobytes()
+
+def _as_slice(indices: range) -> slice:
+    """Converts an index range into the equivalent slice."""
+    if not indices:
+        # An empty range may start at -1, which a slice would read from the end
+        return slice(0, 0)
+    stop = indices.stop if indices.stop >= 0 else None
+    return slice(indices.start, stop, indices.step)
+
+class PatternView:
+    """
+    A lazy, zero-copy view of a slice of a list, Pattern or another view.
+
+    Creating a view, slicing it with any step or reversing it is O(1):
+    only the index range over the original data changes. Like NumPy views,
+    changes to the original are visible through the view. Writing to the
+    view first copies the selected steps (copy-on-write), so the original
+    is never modified through a view; copy() materializes explicitly.
+    """
+    __slots__ = ("_base", "_indices", "_owned", "_nesting")
+
+    def __init__(self, base, start: int = None, stop: int = None, step: int = None):
+        if isinstance(base, PatternView):
+            indices = base._indices[start:stop:step]
+            base = base._base
+        else:
+            indices = range(len(base))[start:stop:step]
+        self._base = base
+        self._indices = indices
+        self._owned = False
+        self._nesting = nesting(base) + 1
+
+    @classmethod
+    def _from(cls, base, indices: range) -> "PatternView":
+        """Creates a view from a base sequence and an index range."""
+        view = cls.__new__(cls)
+        view._base = base
+        view._indices = indices
+        view._owned = False
+        view._nesting = nesting(base) + 1
+        return view
+
+    @property
+    def base(self):
+        """The sequence this view reads from."""
+        return self._base
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PatternView._from(self._base, self._indices[index])
+        return self._base[self._indices[index]]
+
+    def __setitem__(self, index, value):
+        if not self._owned:
+            # Even a view of the whole base shares it, so the first write always copies
+            self._base = self.copy()
+            self._owned = True
+            self._nesting = 1
+        self._base[index] = value
+        # Slice assignment can change the length
+        self._indices = range(len(self._base))
+
+    def __iter__(self):
+        return map(self._base.__getitem__, self._indices)
+
+    def __reversed__(self):
+        return map(self._base.__getitem__, reversed(self._indices))
+
+    def __contains__(self, value) -> bool:
+        return value in iter(self)
+
+    def __add__(self, other):
+        if isinstance(other, (PatternView, RepeatedPattern)):
+            other = other.copy()
+        if not isinstance(other, (list, Pattern)):
+            return NotImplemented
+        return self.copy() + other
+
+    def __radd__(self, other):
+        if not isinstance(other, (list, Pattern)):
+            return NotImplemented
+        return other + self.copy()
+
+    def __mul__(self, repeats):
+        if not isinstance(repeats, int):
+            return NotImplemented
+        return self.copy() * repeats
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, Pattern, PatternView, RepeatedPattern)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PatternView({self.tolist()!r})"
+
+    def copy(self):
+        """Materializes the view as a new list or Pattern (matching the base)."""
+        if isinstance(self._base, (list, Pattern)):
+            return self._base[_as_slice(self._indices)]
+        return like(self._base, self)
+
+    def tolist(self) -> list:
+        """Returns the viewed steps as a list of integers."""
+        return list(self)
+
+class RepeatedPattern:
+    """
+    A lazy repetition of a pattern, equivalent to pattern * repeats.
+
+    Only the base pattern and the repeat count are stored, so extending is
+    O(1) in time and memory regardless of the number of repeats. Indexing
+    maps positions back into the base with modular arithmetic, slicing
+    returns a PatternView and iteration cycles over the base. Changes to
+    the base are visible through the repetition.
+    """
+    __slots__ = ("_base", "_repeats", "_nesting")
+
+    def __init__(self, base, repeats: int):
+        if not isinstance(repeats, int) or repeats < 0:
+            raise ValueError("Repeats must be a non-negative integer.")
+        if isinstance(base, RepeatedPattern):
+            base, repeats = base._base, base._repeats * repeats
+        self._base = base
+        self._repeats = repeats
+        self._nesting = nesting(base) + 1
+
+    @property
+    def base(self):
+        """The pattern being repeated."""
+        return self._base
+
+    @property
+    def repeats(self) -> int:
+        """The number of repetitions."""
+        return self._repeats
+
+    def __len__(self) -> int:
+        return len(self._base) * self._repeats
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PatternView(self, index.start, index.stop, index.step)
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("RepeatedPattern index out of range")
+        return self._base[index % len(self._base)]
+
+    def __setitem__(self, index, value):
+        raise TypeError("RepeatedPattern is read-only; use copy() to get a writable pattern.")
+
+    def __iter__(self):
+        return chain.from_iterable(repeat(self._base, self._repeats))
+
+    def __reversed__(self):
+        return chain.from_iterable(repeat(self._base[::-1], self._repeats))
+
+    def __contains__(self, value) -> bool:
+        return self._repeats > 0 and value in self._base
+
+    def __add__(self, other):
+        if isinstance(other, (PatternView, RepeatedPattern)):
+            other = other.copy()
+        if not isinstance(other, (list, Pattern)):
+            return NotImplemented
+        return self.copy() + other
+
+    def __radd__(self, other):
+        if not isinstance(other, (list, Pattern)):
+            return NotImplemented
+        return other + self.copy()
+
+    def __mul__(self, repeats):
+        if not isinstance(repeats, int):
+            return NotImplemented
+        return RepeatedPattern(self, max(0, repeats))
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, Pattern, PatternView, RepeatedPattern)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"RepeatedPattern({self._base!r}, {self._repeats})"
+
+    def copy(self):
+        """Materializes the repetition as a new list or Pattern (matching the base)."""
+        base = self._base if isinstance(self._base, (list, Pattern)) else self._base.copy()
+        return base * self._repeats
+
+    def tolist(self) -> list:
+        """Returns the repeated steps as a list of integers."""
+        return list(self)
+
+class _RopeNode:
+    """Internal rope node joining two subtrees (ropes, nodes or leaf sequences)."""
+    __slots__ = ("left", "right", "length", "depth")
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.depth = max(_depth(left), _depth(right)) + 1
+
+    def __len__(self) -> int:
+        return self.length
+
+def _depth(node) -> int:
+    """Returns the height of a rope subtree (leaves have height 0)."""
+    return node.depth if isinstance(node, _RopeNode) else 0
+
+def _balance(left, right):
+    """Joins two subtrees whose heights differ by at most two, rotating if needed."""
+    left_depth, right_depth = _depth(left), _depth(right)
+    if left_depth > right_depth + 1:
+        if _depth(left.left) >= _depth(left.right):
+            return _RopeNode(left.left, _RopeNode(left.right, right))
+        inner = left.right
+        return _RopeNode(_RopeNode(left.left, inner.left), _RopeNode(inner.right, right))
+    if right_depth > left_depth + 1:
+        if _depth(right.right) >= _depth(right.left):
+            return _RopeNode(_RopeNode(left, right.left), right.right)
+        inner = right.left
+        return _RopeNode(_RopeNode(left, inner.left), _RopeNode(inner.right, right.right))
+    return _RopeNode(left, right)
+
+def _join(left, right):
+    """Concatenates two subtrees in O(log n), keeping the tree height-balanced."""
+    if left is None or not len(left):
+        return right
+    if right is None or not len(right):
+        return left
+    left_depth, right_depth = _depth(left), _depth(right)
+    if left_depth > right_depth + 1:
+        return _balance(left.left, _join(left.right, right))
+    if right_depth > left_depth + 1:
+        return _balance(_join(left, right.left), right.right)
+    return _RopeNode(left, right)
+
+def _split(node, index: int):
+    """Splits a subtree into (first index steps, remaining steps) in O(log n)."""
+    if node is None or index <= 0:
+        return None, node
+    if index >= len(node):
+        return node, None
+    if not isinstance(node, _RopeNode):
+        return PatternView(node, 0, index), PatternView(node, index)
+    left_length = len(node.left)
+    if index < left_length:
+        head, tail = _split(node.left, index)
+        return head, _join(tail, node.right)
+    if index > left_length:
+        head, tail = _split(node.right, index - left_length)
+        return _join(node.left, head), tail
+    return node.left, node.right
+
+def _leaves(node, reverse: bool = False):
+    """Yields the leaf sequences of a subtree in order."""
+    stack = [node] if node is not None else []
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _RopeNode):
+            if reverse:
+                stack.extend((node.left, node.right))
+            else:
+                stack.extend((node.right, node.left))
+        else:
+            yield node
+
+class Rope:
+    """
+    A concatenation of patterns stored as a height-balanced tree.
+
+    Leaves are the concatenated patterns themselves (shared, not copied),
+    so concatenation, indexing and contiguous slicing are O(log n) and
+    repeated appends stay linear overall instead of quadratic. Slices with
+    a step return a PatternView over the rope. copy() flattens the rope
+    into a contiguous list or Pattern only when needed.
+    """
+    __slots__ = ("_root", "_nesting")
+
+    def __init__(self, *parts):
+        root = None
+        leaf_nesting = 0
+        for part in parts:
+            if isinstance(part, Rope):
+                root = _join(root, part._root)
+                leaf_nesting = max(leaf_nesting, part._nesting - 1)
+            else:
+                root = _join(root, part)
+                leaf_nesting = max(leaf_nesting, nesting(part))
+        self._root = root
+        self._nesting = leaf_nesting + 1
+
+    @classmethod
+    def _from(cls, root, nesting: int) -> "Rope":
+        """Wraps an existing subtree whose leaves are at most nesting - 1 layers deep."""
+        rope = cls.__new__(cls)
+        rope._root = root
+        rope._nesting = nesting
+        return rope
+
+    @property
+    def depth(self) -> int:
+        """Height of the rope tree."""
+        return _depth(self._root)
+
+    def leaves(self) -> list:
+        """Returns the leaf sequences in order."""
+        return list(_leaves(self._root))
+
+    def __len__(self) -> int:
+        return len(self._root) if self._root is not None else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return PatternView(self, index.start, index.stop, index.step)
+            if stop <= start:
+                return Rope()
+            head, _ = _split(self._root, stop)
+            _, middle = _split(head, start)
+            return Rope._from(middle, self._nesting + 1)
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("Rope index out of range")
+        node = self._root
+        while isinstance(node, _RopeNode):
+            left_length = len(node.left)
+            if index < left_length:
+                node = node.left
+            else:
+                index -= left_length
+                node = node.right
+        return node[index]
+
+    def __setitem__(self, index, value):
+        raise TypeError("Rope is read-only; use copy() to get a writable pattern.")
+
+    def __iter__(self):
+        return chain.from_iterable(_leaves(self._root))
+
+    def __reversed__(self):
+        return chain.from_iterable(map(reversed, _leaves(self._root, reverse=True)))
+
+    def __contains__(self, value) -> bool:
+        return any(value in leaf for leaf in _leaves(self._root))
+
+    def __add__(self, other):
+        if not isinstance(other, (list, Pattern, PatternView, RepeatedPattern, Rope)):
+            return NotImplemented
+        return Rope(self, other)
+
+    def __radd__(self, other):
+        if not isinstance(other, (list, Pattern, PatternView, RepeatedPattern)):
+            return NotImplemented
+        return Rope(other, self)
+
+    def __mul__(self, repeats):
+        if not isinstance(repeats, int):
+            return NotImplemented
+        # Repeated doubling shares subtrees, so this is O(log repeats) nodes
+        result, power = None, self._root
+        while repeats > 0:
+            if repeats & 1:
+                result = _join(result, power)
+            repeats >>= 1
+            if repeats:
+                power = _join(power, power)
+        return Rope._from(result, self._nesting)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, Pattern, PatternView, RepeatedPattern, Rope)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Rope({self.tolist()!r})"
+
+    def copy(self):
+        """Flattens the rope into a new list or Pattern (matching the first leaf)."""
+        return like(self, self)
+
+    def tolist(self) -> list:
+        """Returns the concatenated steps as a list of integers."""
+        return list(self)
+
+class PatternRows:
+    """
+    Equal-length patterns stored back to back in one Pattern.
+
+    The python counterpart of a (count, length) NumPy block: samples take
+    one byte each in a single allocation, and indexing returns a
+    PatternView of one row, so no per-row object exists until a row is
+    used. Iteration yields the rows in order.
+    """
+    __slots__ = ("_block", "_length")
+
+    def __init__(self, block, length: int):
+        if not isinstance(length, int) or length <= 0:
+            raise ValueError("Length must be a positive integer.")
+        block = block if isinstance(block, Pattern) else Pattern(block)
+        if len(block) % length:
+            raise ValueError("Block size must be a multiple of the row length.")
+        self._block = block
+        self._length = length
+
+    @property
+    def block(self) -> Pattern:
+        """All rows, concatenated."""
+        return self._block
+
+    @property
+    def length(self) -> int:
+        """Steps per row."""
+        return self._length
+
+    def __len__(self) -> int:
+        return len(self._block) // self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(len(self))[index]]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("PatternRows index out of range")
+        start = index * self._length
+        return PatternView._from(self._block, range(start, start + self._length))
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PatternRows, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PatternRows({self.tolist()!r})"
+
+    def tolist(self) -> list:
+        """Returns the rows as lists of integers."""
+        return [row.tolist() for row in self]
+
+def nesting(pattern) -> int:
+    """
+    Returns how many lazy layers wrap the stored data of a pattern.
+
+    Lists and Patterns have nesting 0; a view, repetition or rope adds one
+    layer to the deepest pattern it reads from. Each layer adds a step to
+    indexing, so callers that build lazy patterns on top of each other can
+    copy() once the nesting passes a bound. This is O(1).
+    """
+    if isinstance(pattern, (PatternView, RepeatedPattern, Rope)):
+        return pattern._nesting
+    return 0
+
+def _storage(pattern):
+    """Returns the list or Pattern underlying a possibly lazy pattern."""
+    while isinstance(pattern, (PatternView, RepeatedPattern, Rope)):
+        if isinstance(pattern, Rope):
+            pattern = next(_leaves(pattern._root), [])
+        else:
+            pattern = pattern.base
+    return pattern
+
+def like(pattern, values):
+    """
+    Builds a new sequence from values with the same storage as pattern.
+
+    Parameters:
+    pattern: A list, Pattern or lazy pattern
+    values: Iterable of amplitude values
+
+    Returns:
+    Pattern if pattern is (lazily derived from) a Pattern, otherwise list
+    """
+    if isinstance(_storage(pattern), Pattern):
+        return Pattern(values)
+    return list(values)
@@ -0,0 +1,199 @@
+"""
+Terminal UI
+Incremental ANSI redraw of the List Operations Lab screen.
+"""
+import contextlib
+import io
+import re
+import shutil
+import sys
+from itertools import zip_longest
+
+ESC = "\x1b["
+CLEAR_SCREEN = ESC + "H" + ESC + "2J"
+CLEAR_LINE = ESC + "2K"
+CLEAR_TO_LINE_END = ESC + "K"
+CLEAR_TO_SCREEN_END = ESC + "J"
+
+# Unchanged gaps shorter than this are rewritten rather than skipped, since
+# a cursor move costs about as many bytes as the characters it skips.
+MIN_SKIP = 6
+
+# Rows needed below the frame for the longest exchange (choosing a
+# transformation and typing three slice values) and the row the last Enter
+# moves to. A frame that leaves fewer free rows makes the terminal scroll,
+# which breaks absolute cursor addressing, so it is repainted in full instead.
+PROMPT_ROWS = 5
+
+# Separates the menu heading from its options in a compact menu
+MENU_SEPARATOR = " | "
+
+def move_to(row: int, column: int) -> str:
+    """Returns the ANSI sequence moving the cursor to a 1-based row and column."""
+    return f"{ESC}{row};{column}H"
+
+def compact_menu(menu, width: int) -> str:
+    """
+    Renders a printed menu as a heading followed by its options, wrapped to a width.
+
+    Rules and blank lines are dropped, as are explanations in parentheses
+    after an option, so a menu takes a few rows instead of one per option.
+
+    Parameters:
+    menu: Callable that prints the menu
+    width (int): Maximum line width
+
+    Returns:
+    str: The compact menu
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        menu()
+    lines = [line.strip() for line in buffer.getvalue().splitlines()]
+    lines = [line for line in lines if line and line.strip("=")]
+    heading = [line for line in lines if not line[0].isdigit()][:1]
+    options = [re.sub(r"\s*\(.*\)$", "", line) for line in lines if line[0].isdigit()]
+
+    rows = heading
+    separator = MENU_SEPARATOR
+    for option in options:
+        if rows and len(rows[-1]) + len(separator) + len(option) <= width:
+            rows[-1] += separator + option
+        else:
+            rows.append(option)
+        separator = "  "
+    return "\n".join(rows)
+
+def _changed_runs(old: str, new: str) -> list:
+    """Returns (start, end) ranges of new that differ from old, merging close runs."""
+    runs = []
+    start = None
+    gap = 0
+    for column in range(len(new)):
+        if column < len(old) and old[column] == new[column]:
+            if start is not None:
+                gap += 1
+            continue
+        if start is not None and gap >= MIN_SKIP:
+            runs.append((start, column - gap))
+            start = None
+        if start is None:
+            start = column
+        gap = 0
+    if start is not None:
+        runs.append((start, len(new) - gap))
+    return runs
+
+class TerminalCanvas:
+    """
+    A fixed screen region redrawn by diffing each frame against the last.
+
+    Only changed character runs are rewritten using cursor addressing, so
+    the bytes sent per update are proportional to what changed.
+    """
+
+    def __init__(self, stream=None, origin_row: int = 1):
+        self.stream = stream if stream is not None else sys.stdout
+        self.origin_row = origin_row
+        self._lines = None
+
+    def invalidate(self) -> None:
+        """Forces the next draw to repaint the whole screen."""
+        self._lines = None
+
+    def diff(self, frame: str) -> str:
+        """
+        Returns the ANSI output that turns the previous frame into this one.
+
+        Parameters:
+        frame (str): The complete new frame
+
+        Returns:
+        str: Escape sequences and text to write
+        """
+        lines = frame.split("\n")
+        if self._lines is None:
+            output = [CLEAR_SCREEN, move_to(self.origin_row, 1), "\n".join(lines)]
+        else:
+            output = []
+            for offset, (old, new) in enumerate(zip_longest(self._lines, lines)):
+                row = self.origin_row + offset
+                if old == new:
+                    continue
+                if new is None or old is None:
+                    # Rows below the old frame hold the prompts typed since, so they are cleared
+                    output.append(move_to(row, 1) + CLEAR_LINE + (new or ""))
+                    continue
+                for start, end in _changed_runs(old, new):
+                    output.append(move_to(row, start + 1) + new[start:end])
+                if len(new) < len(old):
+                    output.append(move_to(row, len(new) + 1) + CLEAR_TO_LINE_END)
+        self._lines = lines
+        return "".join(output)
+
+    def draw(self, frame: str) -> int:
+        """
+        Draws a frame, then parks the cursor below it and clears the rest of the screen.
+
+        Returns:
+        int: Number of characters written
+        """
+        output = self.diff(frame)
+        output += move_to(self.origin_row + len(self._lines), 1) + CLEAR_TO_SCREEN_END
+        self.stream.write(output)
+        self.stream.flush()
+        return len(output)
+
+class TerminalUI:
+    """
+    Screen for the interactive loop that keeps the pattern and menu in place.
+
+    The title, visualization, a compact form of the current menu and a
+    status line form one frame that is redrawn incrementally, so switching
+    menus or showing a message rewrites only the rows that changed. Prompts
+    appear below the frame and are cleared on the next redraw. Call
+    invalidate() after printing anything else below the frame, since the
+    terminal may have scrolled.
+    """
+
+    def __init__(self, render, menu, stream=None, rows: int = None, columns: int = None):
+        self._render = render
+        self._canvas = TerminalCanvas(stream)
+        self._rows = rows
+        self._columns = columns
+        self._menu = menu
+        self._status = ""
+        self._title = "No active pattern"
+        self._pattern = None
+
+    def show(self, title: str, pattern) -> None:
+        """Sets the pattern shown on the next redraw."""
+        self._title = title
+        self._pattern = pattern
+
+    def set_menu(self, menu) -> None:
+        """Sets the menu shown on the next redraw, given as a callable that prints it."""
+        self._menu = menu
+
+    def status(self, message: str) -> None:
+        """Sets the message shown on the status line by the next redraw only."""
+        self._status = message.strip()
+
+    def frame(self) -> str:
+        """Returns the full text of the current screen."""
+        body = self._render(self._pattern) if self._pattern is not None else ""
+        columns = self._columns if self._columns is not None else shutil.get_terminal_size().columns
+        return f"{self._title}\n{body}\n\n{compact_menu(self._menu, columns)}\n{self._status}"
+
+    def invalidate(self) -> None:
+        """Repaints the whole screen on the next redraw."""
+        self._canvas.invalidate()
+
+    def redraw(self) -> int:
+        """Redraws what changed since the last redraw and returns the characters written."""
+        frame = self.frame()
+        rows = self._rows if self._rows is not None else shutil.get_terminal_size().lines
+        if frame.count("\n") + 1 + PROMPT_ROWS > rows:
+            self._canvas.invalidate()
+        self._status = ""
+        return self._canvas.draw(frame)
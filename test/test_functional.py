@@ -210,5 +210,958 @@ def test_display_functions(test_obj):
         test_obj.yakshaAssert("TestDisplayFunctions", False, "functional")
         pytest.fail(f"Display functions test failed: {str(e)}")
 
+def test_seeded_generation(test_obj):
+    """Test reproducible generation with seeds and split streams"""
+    try:
+        from digital_music_mixer import (
+            create_bass_pattern,
+            create_ambient_pattern,
+            shuffle_segments,
+            spawn_streams
+        )
+        
+        # The same seed should reproduce the same pattern
+        assert create_bass_pattern(32, rng=42) == create_bass_pattern(32, rng=42), "Seeded bass patterns should match"
+        assert create_ambient_pattern(32, rng=42) == create_ambient_pattern(32, rng=42), "Seeded ambient patterns should match"
+        
+        # Seeded shuffles should be reproducible and preserve elements
+        original = list(range(20))
+        shuffled = shuffle_segments(original, 4, rng=7)
+        assert shuffled == shuffle_segments(original, 4, rng=7), "Seeded shuffles should match"
+        assert sorted(shuffled) == original, "Seeded shuffle should preserve all list elements"
+        
+        # Split streams should be deterministic and independent
+        first = [create_bass_pattern(16, rng=stream) for stream in spawn_streams(3, 4)]
+        second = [create_bass_pattern(16, rng=stream) for stream in spawn_streams(3, 4)]
+        assert first == second, "Streams from the same seed should reproduce the same patterns"
+        assert len(set(map(tuple, first))) == 4, "Each stream should produce a different pattern"
+        
+        # Negative seeds act as their absolute value with either backend, as random.seed does
+        for backend in ("python", "numpy"):
+            assert create_bass_pattern(16, backend, rng=-5) == create_bass_pattern(16, backend, rng=5), \
+                f"Negative seeds should work with the {backend} backend"
+            negative = [create_bass_pattern(16, rng=stream) for stream in spawn_streams(-3, 2, backend)]
+            assert negative == [create_bass_pattern(16, rng=stream) for stream in spawn_streams(3, 2, backend)], \
+                f"Negative root seeds should split like their absolute value with the {backend} backend"
+        
+        test_obj.yakshaAssert("TestSeededGeneration", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestSeededGeneration", False, "functional")
+        pytest.fail(f"Seeded generation test failed: {str(e)}")
+
+def test_pattern_type(test_obj, sample_list):
+    """Test the array-backed Pattern type with the list operations"""
+    try:
+        from pattern_types import Pattern
+        from digital_music_mixer import (
+            slice_list,
+            reverse_list,
+            extend_list,
+            combine_lists,
+            shuffle_segments
+        )
+        
+        pattern = Pattern(sample_list)
+        assert pattern == sample_list, "Pattern should compare equal to the same list"
+        assert len(pattern) == len(sample_list), "Pattern should preserve length"
+        
+        # List operations should match list semantics and keep the Pattern type
+        assert slice_list(pattern, 2, 15, 3) == sample_list[2:15:3], "Pattern slicing should match list slicing"
+        assert reverse_list(pattern) == sample_list[::-1], "Pattern reversal should match list reversal"
+        assert extend_list(pattern, 3) == sample_list * 3, "Pattern repetition should match list repetition"
+        assert combine_lists(pattern, [1, 2]) == sample_list + [1, 2], "Pattern concatenation should match list concatenation"
+        assert isinstance(reverse_list(pattern), Pattern), "Operations on a Pattern should return a Pattern"
+        assert sorted(shuffle_segments(pattern, 5)) == sorted(sample_list), "Shuffling a Pattern should preserve elements"
+        
+        # Values outside 0-100 should be rejected
+        with pytest.raises(ValueError):
+            Pattern([50, 101])
+        
+        test_obj.yakshaAssert("TestPatternType", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternType", False, "functional")
+        pytest.fail(f"Pattern type test failed: {str(e)}")
+
+def test_shuffle_segments_modes(test_obj, sample_list):
+    """Test preallocated and in-place segment shuffling"""
+    try:
+        from pattern_types import Pattern, PatternView
+        from digital_music_mixer import shuffle_segments
+        
+        expected = shuffle_segments(sample_list, 3, rng=11)
+        
+        # Writing into a preallocated buffer should match the default result
+        out = [0] * len(sample_list)
+        assert shuffle_segments(sample_list, 3, rng=11, out=out) is out, "Shuffle should return the out buffer"
+        assert out == expected, "Preallocated shuffle should match the default result"
+        
+        # In-place shuffling should work with and without a short trailing segment
+        for segment_size in [3, 4, 7, 19, 20]:
+            for seed in range(5):
+                expected = shuffle_segments(sample_list, segment_size, rng=seed)
+                for kind in (list, Pattern):
+                    in_place = kind(sample_list)
+                    assert shuffle_segments(in_place, segment_size, rng=seed, in_place=True) is in_place, "In-place shuffle should return the pattern"
+                    assert in_place == expected, "In-place shuffle should match the default result"
+                    # Writing into the pattern itself is an in-place shuffle
+                    aliased = kind(sample_list)
+                    assert shuffle_segments(aliased, segment_size, rng=seed, out=aliased) == expected, "out=pattern should not lose steps"
+        
+        with pytest.raises(ValueError):
+            shuffle_segments(sample_list, 3, out=[0, 0])
+        shared = list(sample_list)
+        with pytest.raises(ValueError):
+            shuffle_segments(PatternView(shared), 3, out=shared)
+        
+        test_obj.yakshaAssert("TestShuffleSegmentsModes", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestShuffleSegmentsModes", False, "functional")
+        pytest.fail(f"Shuffle segments modes test failed: {str(e)}")
+
+def test_pattern_file_roundtrip(test_obj, sample_list, tmp_path):
+    """Test writing patterns to a binary file and reading them back"""
+    try:
+        import digital_music_mixer as mixer
+        from pattern_file import PatternFile, PatternFileWriter, write_patterns
+        
+        path = str(tmp_path / "patterns.dmmp")
+        patterns = [sample_list, [10, 20, 30], []]
+        assert write_patterns(path, patterns, ["bass", None, "melody"]) == 3, "Should write every pattern"
+        
+        with PatternFile(path) as pattern_file:
+            assert len(pattern_file) == 3, "File should hold three patterns"
+            assert pattern_file[1] == [10, 20, 30], "Pattern should read back unchanged"
+            assert pattern_file[-3] == sample_list, "Negative indexes should work"
+            assert [pattern_file.kind(i) for i in range(3)] == ["bass", None, "melody"], "Kinds should be recorded"
+            assert pattern_file.length(2) == 0, "Empty patterns should be stored"
+        
+        # Values outside 0-100 are rejected on write, so every stored pattern reads back
+        with pytest.raises(ValueError):
+            write_patterns(str(tmp_path / "loud.dmmp"), [[200, 10]])
+        with PatternFileWriter(str(tmp_path / "block.dmmp")) as writer:
+            with pytest.raises(ValueError):
+                writer.append_block([[101, 0]])
+            if mixer.np is not None:
+                with pytest.raises(ValueError):
+                    writer.append_block(mixer.np.array([[300, -1]]))
+        
+        with open(path, "wb") as file:
+            file.write(b"not a pattern file")
+        with pytest.raises(ValueError):
+            PatternFile(path)
+        
+        test_obj.yakshaAssert("TestPatternFileRoundtrip", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternFileRoundtrip", False, "functional")
+        pytest.fail(f"Pattern file roundtrip test failed: {str(e)}")
+
+def test_pattern_library_query(test_obj, tmp_path):
+    """Test storing patterns in the library and querying its index"""
+    try:
+        from pattern_library import PatternLibrary, pattern_stats
+        
+        stats = pattern_stats([0, 50, 40, 100])
+        assert stats["peak"] == 100 and stats["onsets"] == 2, "Peak and onsets should be computed"
+        assert stats["energy"] == 2500 + 1600 + 10000, "Energy should be the sum of squares"
+        
+        path = str(tmp_path / "library.db")
+        with PatternLibrary(path) as library:
+            loud = library.add([95] * 32, "percussion")
+            library.add([10] * 32, "percussion")
+            library.add([95] * 16, "percussion")
+            library.add_many([[95] * 32, [20] * 32], "bass")
+        
+        with PatternLibrary(path) as library:
+            assert len(library) == 5, "Library should persist every pattern"
+            assert library.query("percussion", length=32, peak=(91, None)) == [loud], "Query should use kind, length and peak"
+            assert library.count(peak=(None, 20)) == 2, "Open-ended ranges should work"
+            assert library.get(loud) == [95] * 32, "Stored pattern should read back unchanged"
+            with pytest.raises(ValueError):
+                library.query(volume=5)
+            
+            # Searches without a kind still use an index
+            plan = library._db.execute("EXPLAIN QUERY PLAN SELECT id FROM patterns WHERE peak <= 20 ORDER BY +id").fetchall()
+            assert "INDEX" in str(plan), "Stand-alone statistics should be indexed"
+            quiet = library.query(peak=(None, 20))
+            assert len(quiet) == 2 and quiet == sorted(quiet), "Ids should still be returned in insertion order"
+            
+            # Values outside 0-100 are rejected on insert, so get() can always read them back
+            with pytest.raises(ValueError):
+                library.add([101, 255])
+            with pytest.raises(ValueError):
+                library.add_many([[50], [200]])
+            assert len(library) == 5, "Rejected patterns should not be stored"
+        
+        test_obj.yakshaAssert("TestPatternLibraryQuery", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternLibraryQuery", False, "functional")
+        pytest.fail(f"Pattern library query test failed: {str(e)}")
+
+def test_similarity_index(test_obj):
+    """Test nearest-neighbour lookups in the similarity index"""
+    try:
+        from pattern_similarity import SimilarityIndex, embed, EMBEDDING_SIZE
+        
+        assert len(embed([10, 20, 30])) == EMBEDDING_SIZE, "Embeddings should have a fixed length"
+        assert len(embed(list(range(100)))) == EMBEDDING_SIZE, "Long patterns should be binned"
+        
+        rand = random.Random(4)
+        patterns = [[rand.randint(0, 100) for _ in range(32)] for _ in range(200)]
+        index = SimilarityIndex(seed=1)
+        index.add_many(patterns, keys=[f"p{i}" for i in range(200)])
+        assert len(index) == 200, "Every pattern should be indexed"
+        
+        # A pattern should be its own nearest neighbour, in single and batch queries
+        assert index.query(patterns[7], k=1)[0][0] == "p7", "Query should find the identical pattern"
+        results = index.query_many(patterns[:10], k=3)
+        assert [result[0][0] for result in results] == [f"p{i}" for i in range(10)], "Batch queries should match"
+        assert all(len(result) <= 3 for result in results), "At most k results should be returned"
+        
+        with pytest.raises(ValueError):
+            index.query(patterns[0], k=0)
+        
+        test_obj.yakshaAssert("TestSimilarityIndex", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestSimilarityIndex", False, "functional")
+        pytest.fail(f"Similarity index test failed: {str(e)}")
+
+def test_pattern_history_undo_redo(test_obj, sample_list):
+    """Test undo and redo across transformation versions"""
+    try:
+        from pattern_history import PatternHistory
+        from digital_music_mixer import reverse_list, extend_list
+        
+        history = PatternHistory(sample_list, "Create")
+        reversed_pattern = history.record("Reverse", reverse_list(sample_list, view=True))
+        history.record("Extend", extend_list(reversed_pattern, 3, lazy=True))
+        assert len(history.current) == 60, "Current version should be the last transformation"
+        
+        assert history.undo() == ("Extend", reversed_pattern), "Undo should return the previous version"
+        operation, pattern = history.undo()
+        assert operation == "Reverse" and pattern == sample_list, "Undo should reach the original pattern"
+        assert not history.can_undo, "The starting version cannot be undone"
+        
+        assert history.redo()[1] == sample_list[::-1], "Redo should reapply the reversal"
+        history.record("Extend", extend_list(history.current, 2, lazy=True))
+        assert not history.can_redo, "Recording should discard undone versions"
+        
+        with pytest.raises(ValueError):
+            history.redo()
+        
+        # Hundreds of interleaved reverse and combine edits leave a usable pattern
+        from digital_music_mixer import combine_lists, shuffle_segments
+        pattern, expected = list(sample_list), list(sample_list)
+        history = PatternHistory(pattern, "Create")
+        for i in range(300):
+            pattern = history.record("Reverse", reverse_list(pattern, view=True))
+            pattern = history.record("Combine", combine_lists(pattern, [i % 101, 50], rope=True))
+            expected = expected[::-1] + [i % 101, 50]
+        assert list(history.current) == expected, "Iterating the last version should give every step"
+        assert pattern[len(pattern) // 2] == expected[len(expected) // 2], "Indexing should reach the middle"
+        assert sorted(shuffle_segments(pattern, 4, rng=1)) == sorted(expected), "Shuffling should keep every step"
+        assert history.undo()[1] == expected[:-2], "Undo should still step back one edit"
+        
+        test_obj.yakshaAssert("TestPatternHistoryUndoRedo", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternHistoryUndoRedo", False, "functional")
+        pytest.fail(f"Pattern history undo/redo test failed: {str(e)}")
+
+def test_transform_plan(test_obj, sample_list):
+    """Test that transformation plans simplify and match step-by-step results"""
+    try:
+        from pattern_plan import plan
+        from digital_music_mixer import reverse_list, slice_list, extend_list, shuffle_segments
+        
+        # Double reversal and nested slices collapse to a single range
+        assert plan(sample_list).reverse().reverse().segments == [(sample_list, range(20), 1)], "Double reversal should cancel"
+        assert len(plan(sample_list).slice(0, None, 2).slice(1, None, 3).segments) == 1, "Slices should compose"
+        
+        # Slicing a long repetition keeps only the repeated range
+        repeated = plan(sample_list).extend(1000).slice(0, None, 5)
+        assert repeated.segments == [(sample_list, range(0, 20, 5), 1000)], "Slices should push through repetitions"
+        
+        expected = shuffle_segments(slice_list(extend_list(reverse_list(sample_list), 3), 5, 50, 3) + [7, 8], 2, rng=3)
+        result = plan(sample_list).reverse().extend(3).slice(5, 50, 3).combine([7, 8]).shuffle(2, rng=3).execute()
+        assert result == expected, "Plan should match applying each transformation"
+        
+        with pytest.raises(ValueError):
+            plan(sample_list).slice(0, None, 0)
+        
+        test_obj.yakshaAssert("TestTransformPlan", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestTransformPlan", False, "functional")
+        pytest.fail(f"Transform plan test failed: {str(e)}")
+
+def test_mix_patterns(test_obj):
+    """Test summing tracks with gains, alignment and level control"""
+    try:
+        from pattern_mix import mix_patterns
+        
+        bass, melody = [10, 20], [1, 2, 3, 4, 5]
+        assert mix_patterns([bass, melody], backend="python") == [11, 22, 13, 24, 15], "Short tracks should loop"
+        assert mix_patterns([bass, melody], align="pad", backend="python") == [11, 22, 3, 4, 5], "Pad should add silence"
+        assert mix_patterns([bass, melody], align="truncate", backend="python") == [11, 22], "Truncate should cut to the shortest"
+        
+        # Gains are applied per track and the sum is clipped or normalized to 0-100
+        assert mix_patterns([[60, 80], [60, 10]], gains=[1, 0.5], backend="python") == [90, 85], "Gains should scale tracks"
+        assert mix_patterns([[90, 80], [90, 10]], backend="python") == [100, 90], "Sums should be clipped to 100"
+        assert mix_patterns([[90, 80], [90, 10]], level="normalize", backend="python") == [100, 50], "Normalize should scale the peak to 100"
+        
+        with pytest.raises(ValueError):
+            mix_patterns([bass, melody], gains=[1])
+        with pytest.raises(ValueError):
+            mix_patterns([])
+        
+        test_obj.yakshaAssert("TestMixPatterns", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestMixPatterns", False, "functional")
+        pytest.fail(f"Mix patterns test failed: {str(e)}")
+
+def test_render_wav(test_obj, tmp_path):
+    """Test rendering a pattern to a WAV file in blocks"""
+    try:
+        import wave
+        from pattern_audio import render_frames, render_wav, samples_per_step
+        
+        pattern = [100, 0, 50, 25]
+        path = str(tmp_path / "pattern.wav")
+        frames = render_wav(pattern, path, bpm=120, sample_rate=8000, backend="python")
+        assert frames == round(len(pattern) * samples_per_step(120, 4, 8000)), "Each step should last a sixteenth note"
+        
+        with wave.open(path, "rb") as audio:
+            assert audio.getnchannels() == 1 and audio.getsampwidth() == 2, "Output should be 16-bit mono"
+            assert audio.getframerate() == 8000 and audio.getnframes() == frames, "Header should match the render"
+        
+        # Blocks never exceed the block size and a silent step renders as silence
+        blocks = list(render_frames(pattern, sample_rate=8000, block_size=100, backend="python"))
+        assert all(len(block) <= 200 for block in blocks), "Blocks should hold at most block_size frames"
+        silent = b"".join(blocks)[2 * 1000:2 * 2000]
+        assert silent == bytes(len(silent)), "Amplitude 0 should be silent"
+        
+        with pytest.raises(ValueError):
+            render_wav(pattern, path, waveform="noise")
+        
+        test_obj.yakshaAssert("TestRenderWav", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestRenderWav", False, "functional")
+        pytest.fail(f"Render WAV test failed: {str(e)}")
+
+def test_pattern_player_swap(test_obj):
+    """Test that the player loops patterns and swaps them on bar lines"""
+    try:
+        import asyncio
+        from pattern_player import MemorySink, PatternPlayer
+        
+        sink = MemorySink()
+        player = PatternPlayer(sink, [1, 2, 3], bpm=6000, steps_per_bar=4)
+        
+        async def play():
+            task = asyncio.create_task(player.run(steps=12))
+            while len(sink.events) < 2:
+                await asyncio.sleep(0)
+            player.swap([7, 8])
+            return await task
+        
+        stats = asyncio.run(play())
+        values = [event.value for event in sink.events]
+        assert values[:4] == [1, 2, 3, 1], "The first pattern should loop until the bar line"
+        assert values[4:] == [7, 8] * 4, "The swapped pattern should start on the next bar"
+        assert [event.step for event in sink.events] == list(range(12)), "Every step should be emitted"
+        assert stats.count == 12 and stats.maximum >= 0, "Jitter should be recorded for every step"
+        
+        with pytest.raises(ValueError):
+            PatternPlayer(sink, bpm=0)
+        
+        test_obj.yakshaAssert("TestPatternPlayerSwap", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternPlayerSwap", False, "functional")
+        pytest.fail(f"Pattern player swap test failed: {str(e)}")
+
+def test_pattern_analysis(test_obj):
+    """Test whole-pattern measurements and rolling statistics"""
+    try:
+        from pattern_analysis import analyze, rolling_stats, RollingStats
+        
+        result = analyze([0, 40, 30, 60, 0, 40, 30, 60], backend="python")
+        assert result["mean"] == 32.5 and result["peak"] == 60, "Mean and peak should be computed"
+        assert abs(result["rms"] - (sum(v * v for v in [0, 40, 30, 60]) / 4) ** 0.5) < 1e-9, "RMS should be computed"
+        assert result["onsets"] == [1, 3, 5, 7], "Onsets should be rises of at least 20"
+        assert result["period"] == 4, "The repeating length should be detected"
+        assert analyze([50] * 8, backend="python")["period"] is None, "A flat pattern has no period"
+        
+        # Rolling statistics cover the last window steps, across chunk boundaries
+        rolling = RollingStats(3)
+        for value in [10, 50, 20]:
+            rolling.update(value)
+        mean, peak, rms, onsets = rolling.update(30)
+        assert (mean, peak, onsets) == (100 / 3, 50, 1), "The oldest step should leave the window"
+        
+        chunks = [[10, 50], [20, 30, 90]]
+        stats = list(rolling_stats(chunks, 3, backend="python"))
+        assert stats[1]["peak"] == [50, 50, 90], "Peaks should carry over between chunks"
+        
+        with pytest.raises(ValueError):
+            RollingStats(0)
+        
+        test_obj.yakshaAssert("TestPatternAnalysis", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternAnalysis", False, "functional")
+        pytest.fail(f"Pattern analysis test failed: {str(e)}")
+
+def test_benchmark_suite(test_obj):
+    """Test benchmark result records and baseline comparison"""
+    try:
+        from mixer_benchmark import run_benchmarks, compare_results
+        
+        results = run_benchmarks(["create_bass", "reverse_list"], sizes=[64, 256], repeat=1, backend="python")
+        assert [(r["benchmark"], r["size"]) for r in results] == [
+            ("create_bass", 64), ("reverse_list", 64), ("create_bass", 256), ("reverse_list", 256)
+        ], "There should be one result per benchmark and size"
+        assert all(set(r) == {"benchmark", "size", "backend", "best_s", "median_s", "peak_bytes"} for r in results), \
+            "Every result should record time and memory"
+        
+        def result(name, best_s, peak_bytes, size=64):
+            return {"benchmark": name, "size": size, "backend": "python",
+                    "best_s": best_s, "median_s": best_s, "peak_bytes": peak_bytes}
+        
+        baseline = [result("slower", 1.0, 1000), result("larger", 1.0, 1000), result("steady", 1.0, 1000),
+                    result("both", 1.0, 1000), result("zero", 0.0, 0)]
+        current = [result("slower", 1.5, 1000), result("larger", 1.0, 1300), result("steady", 1.1, 900),
+                   result("both", 2.0, 4000), result("zero", 1.0, 10), result("new", 9.0, 9000),
+                   result("slower", 9.0, 9000, size=128)]
+        flagged = [(r["benchmark"], metric, ratio) for r, metric, ratio in compare_results(current, baseline, 0.2)]
+        assert flagged == [
+            ("slower", "best_s", 1.5), ("larger", "peak_bytes", 1.3), ("both", "best_s", 2.0), ("both", "peak_bytes", 4.0)
+        ], "Only increases above the threshold on matching results should be flagged"
+        assert compare_results(current, baseline, 5.0) == [], "A looser threshold should flag nothing"
+        
+        with pytest.raises(ValueError):
+            run_benchmarks(["missing"], sizes=[64])
+        with pytest.raises(ValueError):
+            compare_results(current, baseline, -1)
+        
+        test_obj.yakshaAssert("TestBenchmarkSuite", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestBenchmarkSuite", False, "functional")
+        pytest.fail(f"Benchmark suite test failed: {str(e)}")
+
+def test_pattern_view_copy_on_write(test_obj, sample_list):
+    """Test that views are lazy and never write through to their base"""
+    try:
+        from digital_music_mixer import slice_list, reverse_list
+        from pattern_types import Pattern, PatternView, RepeatedPattern, Rope
+        
+        original = list(sample_list)
+        view = slice_list(sample_list, 2, 15, 3, view=True)
+        assert view == sample_list[2:15:3], "A view should match list slicing"
+        assert view[::-1] == sample_list[2:15:3][::-1], "Views should slice further"
+        assert reverse_list(sample_list, view=True) == sample_list[::-1], "Reversed views should match"
+        
+        # Changes to the base are visible until the view is written to
+        base = list(sample_list)
+        full = slice_list(base, 0, None, 1, view=True)
+        base[1] = 0
+        assert full[1] == 0, "Base changes should show through the view"
+        full[0] = 99
+        assert base[0] == sample_list[0] and full[0] == 99, "A full-range view should copy before writing"
+        
+        # Slice writes that change the length keep every step
+        view = PatternView([0, 1, 2, 3])
+        view[0:1] = [9, 9, 9]
+        assert len(view) == 6 and view.tolist() == [9, 9, 9, 1, 2, 3], "Length-changing writes should keep all steps"
+        
+        lazy_bases = [
+            (RepeatedPattern([1, 2], 2), [50, 2, 1, 2]),
+            (Rope([1, 2]) + [3, 4], [50, 2, 3, 4]),
+            (PatternView(Pattern([1, 2, 3, 4])), [50, 2, 3, 4]),
+        ]
+        for lazy, expected in lazy_bases:
+            view = PatternView(lazy)
+            view[0] = 50
+            assert view.tolist() == expected, "Lazy bases should be copied"
+            assert lazy[0] == 1, "Lazy bases should be left unchanged"
+        assert sample_list == original, "The source list should be untouched"
+        
+        # Empty views from negative-step slices copy to nothing
+        from digital_music_mixer import extend_list
+        empty = slice_list(reverse_list([10, 20, 30, 40], view=True), 100, view=True)
+        assert len(empty) == 0 and empty.copy() == [], "An empty view should copy to an empty list"
+        assert empty + [1] == [1] and extend_list(empty, 2) == [], "An empty view should add no steps"
+        descending = list(range(60, 0, -2))
+        empty = slice_list(descending, -11, None, -3, view=True)[::2]
+        assert len(empty) == 0 and empty.copy() == [], "Empty negative-step views should copy to an empty list"
+        assert PatternView(Pattern([1, 2, 3]), -1, 5)[1:].copy() == Pattern([]), "Empty Pattern views should copy empty"
+        
+        test_obj.yakshaAssert("TestPatternViewCopyOnWrite", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternViewCopyOnWrite", False, "functional")
+        pytest.fail(f"Pattern view test failed: {str(e)}")
+
+def test_pattern_player_outputs(test_obj, tmp_path):
+    """Test that the first pattern starts at once and a FIFO without a reader never blocks"""
+    try:
+        import asyncio
+        import os
+        from pattern_player import FileSink, MemorySink, PatternPlayer, StepEvent
+        
+        sink = MemorySink()
+        player = PatternPlayer(sink, bpm=6000, steps_per_bar=1000)
+        
+        async def play():
+            task = asyncio.create_task(player.run(steps=100))
+            await asyncio.sleep(0.01)
+            player.swap([5, 6])
+            return await task
+        
+        asyncio.run(play())
+        assert sink.events and sink.events[0].step > 0, "The first pattern should not wait for a bar line"
+        assert [event.value for event in sink.events][:2] == [5, 6], "The first pattern should start from its first step"
+        
+        path = tmp_path / "steps.txt"
+        sink = FileSink(str(path))
+        sink.write(StepEvent(0.0, 0, 0, 42))
+        sink.close()
+        assert path.read_text() == "0.000000 0 42\n", "Steps should be written as lines"
+        
+        if hasattr(os, "mkfifo"):
+            fifo = tmp_path / "fifo"
+            os.mkfifo(fifo)
+            sink = FileSink(str(fifo))
+            sink.write(StepEvent(0.0, 0, 0, 42))
+            assert sink.dropped == 1, "Steps should be dropped while the FIFO has no reader"
+            
+            player = PatternPlayer(sink, [1, 2], bpm=6000)
+            player.start()
+            player.stop(timeout=2)
+            assert player._thread is None, "Stopping should not hang on a FIFO without a reader"
+        
+        test_obj.yakshaAssert("TestPatternPlayerOutputs", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternPlayerOutputs", False, "functional")
+        pytest.fail(f"Pattern player output test failed: {str(e)}")
+
+def test_terminal_canvas_diff(test_obj):
+    """Test that incremental redraws rewrite only what changed"""
+    try:
+        import io
+        import digital_music_mixer as mixer
+        from terminal_ui import (TerminalCanvas, TerminalUI, CLEAR_LINE, CLEAR_SCREEN, CLEAR_TO_LINE_END,
+                                 PROMPT_ROWS, compact_menu, move_to)
+        
+        stream = io.StringIO()
+        canvas = TerminalCanvas(stream)
+        canvas.draw("title\nabc\nmenu")
+        assert stream.getvalue().startswith(CLEAR_SCREEN), "The first draw should repaint the screen"
+        
+        assert canvas.diff("title\nabc\nmenu") == "", "An unchanged frame should send nothing"
+        assert canvas.diff("title\nabX\nmenu") == move_to(2, 3) + "X", "Only the changed run should be rewritten"
+        assert canvas.diff("title\na\nmenu") == move_to(2, 2) + CLEAR_TO_LINE_END, "Shorter lines should be cleared to the end"
+        
+        # Rows below the old frame held prompts, so they are cleared before writing
+        assert canvas.diff("title\na\nmenu\nmore") == move_to(4, 1) + CLEAR_LINE + "more", "New rows should be cleared"
+        assert canvas.diff("title\na") == move_to(3, 1) + CLEAR_LINE + move_to(4, 1) + CLEAR_LINE, "Removed rows should be cleared"
+        
+        # A frame too tall for the terminal is always repainted in full
+        stream = io.StringIO()
+        ui = TerminalUI(lambda pattern: "\n".join(map(str, pattern)), lambda: print("menu"), stream, rows=12, columns=80)
+        ui.redraw()
+        ui.show("Pattern", [1, 2, 3, 4])
+        ui.redraw()
+        assert stream.getvalue().count(CLEAR_SCREEN) == 2, "Tall frames should be repainted"
+        ui.show("Pattern", [1])
+        ui.redraw()
+        assert stream.getvalue().count(CLEAR_SCREEN) == 2, "Frames that fit should be diffed"
+        ui.invalidate()
+        ui.redraw()
+        assert stream.getvalue().count(CLEAR_SCREEN) == 3, "invalidate should force a repaint"
+        
+        # Messages and menu switches are drawn inside the frame
+        ui.status("Nothing to undo.")
+        ui.redraw()
+        assert ui.frame().endswith("menu\n"), "The status line should be cleared after one redraw"
+        assert stream.getvalue().endswith(move_to(5, 1) + "Nothing to undo." + move_to(6, 1) + "\x1b[J"), \
+            "A message should be written on the status line"
+        ui.set_menu(lambda: print("Other\n=====\n1. One (x)\n2. Two"))
+        ui.redraw()
+        expected = move_to(4, 1) + "Other | 1. One  2. Two" + move_to(5, 1) + CLEAR_TO_LINE_END + move_to(6, 1) + "\x1b[J"
+        assert stream.getvalue().endswith(expected), "Switching menus should rewrite only the menu and status rows"
+        
+        # The real screen fits a standard 80x24 terminal with room for the prompts
+        assert compact_menu(mixer.display_transformation_menu, 80).count("\n") == 2, "The menu should take three rows"
+        ui = TerminalUI(mixer.visualize_list, mixer.display_transformation_menu, io.StringIO(), rows=24, columns=80)
+        ui.show("Current Pattern", mixer.create_bass_pattern(64, rng=1))
+        ui.status("Please enter a number.")
+        assert ui.frame().count("\n") + 1 + PROMPT_ROWS <= 24, "The frame should fit 24 rows"
+        
+        test_obj.yakshaAssert("TestTerminalCanvasDiff", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestTerminalCanvasDiff", False, "functional")
+        pytest.fail(f"Terminal canvas test failed: {str(e)}")
+
+def test_pipeline_stages(test_obj, sample_list):
+    """Test that pipeline stages match list semantics chunk by chunk"""
+    try:
+        import io
+        import digital_music_mixer as mixer
+        from pattern_pipeline import Pipeline
+        
+        for chunk_size in (1, 3, 7, 50):
+            pipeline = lambda: Pipeline.from_pattern(sample_list, chunk_size)
+            assert pipeline().slice(2, 17, 3).collect() == sample_list[2:17:3], "Slicing should match lists"
+            assert pipeline().repeat(3).collect() == sample_list * 3, "Repeating should match lists"
+            assert pipeline().concat([[1, 2]]).collect() == sample_list + [1, 2], "Concatenating should match lists"
+            assert [len(chunk) for chunk in pipeline().rechunk(6)] == [6, 6, 6, 2], "Rechunking should regroup values"
+        
+        # Segments stay intact and the order depends only on the seed
+        shuffled = Pipeline.from_pattern(sample_list, 4).shuffle_segments(3, rng=5).collect()
+        segments, position = [], 0
+        while position < len(shuffled):
+            start = (shuffled[position] - 1) // 3 * 3
+            segment = sample_list[start:start + 3]
+            assert shuffled[position:position + len(segment)] == segment, "Whole segments should stay intact"
+            segments.append(segment)
+            position += len(segment)
+        assert sorted(segments) == [sample_list[i:i + 3] for i in range(0, 20, 3)], "Every segment should appear once"
+        assert shuffled != sample_list, "Segments should be reordered"
+        assert Pipeline.from_pattern(sample_list, 4).shuffle_segments(3, rng=5).collect() == shuffled, "Seeds should be reproducible"
+        if mixer.np is not None:
+            numpy_result = Pipeline.from_pattern(sample_list, 4).shuffle_segments(3, rng=5, backend="numpy").collect()
+            assert numpy_result == shuffled, "Both backends should give the same order"
+        
+        # A finished slice does not pull another chunk from an endless source
+        pulled = []
+        def source():
+            while True:
+                pulled.append(1)
+                yield [50] * 10
+        assert len(Pipeline(source(), 10).slice(0, 20).collect()) == 20 and len(pulled) == 2, "Slicing should stop at the end"
+        
+        output = io.BytesIO()
+        assert Pipeline.from_pattern(sample_list, 8).write_to(output) == 20 and output.getvalue() == bytes(sample_list), \
+            "Values should be written as bytes"
+        
+        test_obj.yakshaAssert("TestPipelineStages", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPipelineStages", False, "functional")
+        pytest.fail(f"Pipeline stage test failed: {str(e)}")
+
+def test_pattern_engine_determinism(test_obj):
+    """Test that parallel generation gives the same library for any worker count"""
+    try:
+        import digital_music_mixer as mixer
+        from pattern_engine import generate_library, patterns_per_stream
+        
+        count, length = 2 * patterns_per_stream(16) + 40, 16
+        libraries = []
+        for workers in (1, 2):
+            with generate_library("melody", length, count, seed=1234, workers=workers, backend="python") as result:
+                assert len(result) == count and result.seed == 1234, "Every pattern should be generated"
+                assert sum(stats["patterns"] for stats in result.worker_stats.values()) == count, \
+                    "Worker statistics should add up to the pattern count"
+                libraries.append(bytes(result.buffer))
+                first = result.pattern(0)
+        assert libraries[0] == libraries[1], "Results should not depend on the number of workers"
+        
+        # Each stream is an independent seeded block, so it can be reproduced on its own
+        expected = mixer.create_patterns("melody", length, 1, "python", rng=mixer.get_stream(1234, 0, "python"))
+        assert first == list(expected[0]), "The first pattern should come from the first stream"
+        
+        with pytest.raises(ValueError):
+            generate_library("drums", length, count, workers=1)
+        
+        test_obj.yakshaAssert("TestPatternEngineDeterminism", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternEngineDeterminism", False, "functional")
+        pytest.fail(f"Pattern engine determinism test failed: {str(e)}")
+
+def test_batch_cli(test_obj, tmp_path, capsys):
+    """Test argument parsing, job files and exit status of the batch command line"""
+    try:
+        import argparse
+        import json
+        from mixer_cli import main, parse_pattern_spec, parse_slice_spec
+        
+        assert parse_pattern_spec("bass:32") == ("bass", 32), "Generator specs should be parsed"
+        assert parse_slice_spec("2:") == (2, None, 1) and parse_slice_spec("-3::2") == (-3, None, 2), "Slice specs should be parsed"
+        for spec, parse in (("drums:8", parse_pattern_spec), ("bass:0", parse_pattern_spec), ("1:2:3:4", parse_slice_spec)):
+            with pytest.raises(argparse.ArgumentTypeError):
+                parse(spec)
+        
+        assert main(["--generate", "bass:8", "--seed", "7", "--format", "json"]) == 0, "A valid job should succeed"
+        full = json.loads(capsys.readouterr().out)
+        assert main(["--generate", "bass:8", "--seed", "7", "--format", "json", "--slice", "-3:"]) == 0, \
+            "Negative slice bounds should not be taken for options"
+        assert json.loads(capsys.readouterr().out) == full[-3:], "Negative slices should match list slicing"
+        
+        # Bad lines are reported and fail the run without stopping the other jobs
+        output = tmp_path / "out.txt"
+        jobs = tmp_path / "jobs.txt"
+        jobs.write_text(
+            "# comment\n"
+            f"--generate bass:8 --seed 7 --output {output}\n"
+            "--generate drums:8\n"
+            f"--generate melody:4 --seed 7 --reverse --output {output}\n"
+        )
+        assert main(["--jobs", str(jobs)]) == 1, "A bad job line should fail the run"
+        lines = output.read_text().splitlines()
+        assert len(lines) == 2 and lines[0] == " ".join(map(str, full)), "Jobs sharing an output file should append"
+        assert main(["--jobs", str(tmp_path / "missing.txt")]) == 1, "A missing job file should fail the run"
+        
+        # Options given next to --jobs would be ignored, so the run is refused
+        output.write_text("")
+        assert main(["--jobs", str(jobs), "--generate", "bass:8"]) == 1, "--jobs with --generate should fail"
+        assert main(["--jobs", str(jobs), "--reverse"]) == 1, "--jobs with a chain option should fail"
+        assert output.read_text() == "", "No job should run when --jobs is combined with other options"
+        assert "cannot be combined" in capsys.readouterr().err, "The reason should be reported"
+        
+        test_obj.yakshaAssert("TestBatchCli", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestBatchCli", False, "functional")
+        pytest.fail(f"Batch command line test failed: {str(e)}")
+
+def test_pattern_mipmap_summaries(test_obj):
+    """Test mipmap range summaries against a brute-force scan"""
+    try:
+        import random
+        from pattern_mipmap import PatternMipmap, visualize_window
+        
+        rng = random.Random(3)
+        for length in (1, 2, 7, 64, 257):
+            pattern = [rng.randint(0, 100) for _ in range(length)]
+            mipmap = PatternMipmap(pattern)
+            for _ in range(50):
+                start = rng.randrange(length)
+                stop = rng.randint(start + 1, length)
+                values = pattern[start:stop]
+                expected = (min(values), max(values), sum(values) / len(values))
+                assert mipmap.summarize(start, stop) == expected, "Summaries should match a brute-force scan"
+        
+        # The mipmap keeps its own copy of the pattern
+        pattern = [10, 20, 30, 40]
+        mipmap = PatternMipmap(pattern)
+        pattern[0] = 100
+        assert mipmap.summarize(0, 4) == (10, 40, 25.0), "Later changes should not affect the summary"
+        assert mipmap.columns(width=2) == [20, 40], "Columns should aggregate each bucket"
+        assert "Steps 0-3" in visualize_window(mipmap, width=2), "The window caption should give the range"
+        with pytest.raises(ValueError):
+            mipmap.summarize(2, 2)
+        
+        test_obj.yakshaAssert("TestPatternMipmapSummaries", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestPatternMipmapSummaries", False, "functional")
+        pytest.fail(f"Pattern mipmap test failed: {str(e)}")
+
+def test_numpy_ambient_walk(test_obj):
+    """Test the vectorized ambient walk against step-by-step clamping with the same draws"""
+    np = pytest.importorskip("numpy")
+    try:
+        import digital_music_mixer as mixer
+        
+        rows, length = 40, 2 * mixer._WALK_BLOCK + 300  # Spans several column blocks
+        walks = mixer._numpy_ambient((rows, length), np.random.default_rng(11))
+        
+        generator = np.random.default_rng(11)
+        values = generator.integers(30, 71, size=rows).tolist()
+        steps = generator.integers(-5, 6, size=(rows, length)).tolist()
+        for row in range(rows):
+            value, expected = values[row], []
+            for step in steps[row]:
+                value = max(10, min(90, value + step))
+                expected.append(value)
+            assert walks[row].tolist() == expected, "Each walk should match sequential clamping"
+        assert walks.min() == 10 and walks.max() == 90, "The walks should reach both bounds"
+        
+        # Continuing from given values matches one longer walk
+        whole = mixer._numpy_ambient((1, 8), np.random.default_rng(5), np.array([90]))
+        expected = [90]
+        for step in np.random.default_rng(5).integers(-5, 6, size=8).tolist():
+            expected.append(max(10, min(90, expected[-1] + step)))
+        assert whole[0].tolist() == expected[1:], "Walks should continue from the given value"
+        
+        test_obj.yakshaAssert("TestNumpyAmbientWalk", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestNumpyAmbientWalk", False, "functional")
+        pytest.fail(f"NumPy ambient walk test failed: {str(e)}")
+
+def test_create_patterns_batch(test_obj):
+    """Test batch generation shapes, types and reproducibility"""
+    try:
+        import random
+        import digital_music_mixer as mixer
+        
+        for kind in mixer.PATTERN_KINDS:
+            batch = mixer.create_patterns(kind, 12, 5, "python", rng=3)
+            assert len(batch) == 5 and all(len(pattern) == 12 for pattern in batch), "Python batches should hold 5 rows"
+            rand = random.Random(3)
+            singles = [mixer.PATTERN_GENERATORS[kind](12, "python", rng=rand) for _ in range(5)]
+            assert batch == singles, "A batch should match consecutive single calls on one stream"
+            assert isinstance(batch.block, mixer.Pattern) and len(batch.block) == 60, "Rows should share one contiguous Pattern"
+            assert batch[-1] == singles[-1] and batch[1:3] == singles[1:3], "Rows should index like a list"
+            assert batch.block.tobytes() == bytes(sum(singles, [])), "The block should hold the rows back to back"
+            
+            if mixer.np is not None:
+                block = mixer.create_patterns(kind, 12, 5, "numpy", rng=3)
+                assert block.shape == (5, 12) and block.dtype == mixer.np.uint8, "NumPy batches should be (count, length) uint8"
+                assert block.flags["C_CONTIGUOUS"], "NumPy batches should be contiguous"
+                assert 0 <= block.min() and block.max() <= 100, "Values should stay within 0-100"
+                assert (mixer.create_patterns(kind, 12, 5, "numpy", rng=3) == block).all(), "Seeded batches should repeat"
+        
+        with pytest.raises(ValueError):
+            mixer.create_patterns("drums", 12, 5)
+        with pytest.raises(ValueError):
+            mixer.create_patterns("bass", 12, 0)
+        
+        test_obj.yakshaAssert("TestCreatePatternsBatch", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestCreatePatternsBatch", False, "functional")
+        pytest.fail(f"Batch pattern creation test failed: {str(e)}")
+
+def test_stream_pattern_chunks(test_obj):
+    """Test that streamed patterns keep their structure across chunk boundaries"""
+    try:
+        import itertools
+        import digital_music_mixer as mixer
+        
+        backends = ["python"] + (["numpy"] if mixer.np is not None else [])
+        for backend in backends:
+            for chunk_size in (3, 5):
+                chunks = mixer.stream_pattern("bass", chunk_size, backend, rng=1)
+                values = [value for chunk in itertools.islice(chunks, 10) for value in chunk]
+                assert len(values) == 10 * chunk_size, "Every chunk should have chunk_size values"
+                assert all((60 <= v <= 100) if i % 4 == 0 else (20 <= v <= 50) for i, v in enumerate(values)), \
+                    "Bass downbeats should stay every 4 steps across chunks"
+                
+                chunks = mixer.stream_pattern("percussion", chunk_size, backend, rng=1)
+                values = [value for chunk in itertools.islice(chunks, 10) for value in chunk]
+                assert all((80 <= v <= 100) if i % 2 == 0 else (0 <= v <= 10) for i, v in enumerate(values)), \
+                    "Percussion should keep alternating across chunks"
+                
+                chunks = mixer.stream_pattern("ambient", chunk_size, backend, rng=1)
+                values = [value for chunk in itertools.islice(chunks, 10) for value in chunk]
+                assert all(abs(b - a) <= 5 and 10 <= b <= 90 for a, b in zip(values, values[1:])), \
+                    "The ambient walk should continue across chunks"
+        
+        # Single values and python chunks come from the same stream
+        single = list(itertools.islice(mixer.stream_pattern("melody", rng=4), 12))
+        chunked = [value for chunk in itertools.islice(mixer.stream_pattern("melody", 4, "python", rng=4), 3) for value in chunk]
+        assert single == chunked, "Chunking should not change python stream values"
+        
+        test_obj.yakshaAssert("TestStreamPatternChunks", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestStreamPatternChunks", False, "functional")
+        pytest.fail(f"Stream pattern test failed: {str(e)}")
+
+def test_repeated_pattern(test_obj, sample_list):
+    """Test that lazy repetition behaves like list * n"""
+    try:
+        from digital_music_mixer import extend_list
+        from pattern_types import RepeatedPattern
+        
+        expected = sample_list * 3
+        repeated = extend_list(sample_list, 3, lazy=True)
+        assert isinstance(repeated, RepeatedPattern) and len(repeated) == 60, "Extending lazily should not copy"
+        assert [repeated[i] for i in range(-60, 60)] == expected + expected, "Indexing should wrap into the base"
+        for index in (slice(5, 47), slice(-25, None), slice(None, None, 7), slice(50, 3, -4), slice(None, None, -1)):
+            assert list(repeated[index]) == expected[index], f"Slicing with {index} should match lists"
+        assert list(reversed(repeated)) == expected[::-1], "Reversal should match lists"
+        assert repeated * 2 == expected * 2 and RepeatedPattern(repeated, 2).repeats == 6, "Repetitions should nest"
+        assert repeated.copy() == expected and isinstance(repeated.copy(), list), "copy() should materialize a list"
+        
+        with pytest.raises(IndexError):
+            repeated[60]
+        with pytest.raises(TypeError):
+            repeated[0] = 1
+        
+        test_obj.yakshaAssert("TestRepeatedPattern", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestRepeatedPattern", False, "functional")
+        pytest.fail(f"Repeated pattern test failed: {str(e)}")
+
+def test_rope_concatenation(test_obj, sample_list):
+    """Test that ropes behave like concatenated lists and stay balanced"""
+    try:
+        import math
+        from digital_music_mixer import combine_lists
+        from pattern_types import Pattern, Rope
+        
+        rope = combine_lists(sample_list, [7, 8, 9], rope=True)
+        expected = sample_list + [7, 8, 9]
+        assert isinstance(rope, Rope) and rope == expected, "Combining as a rope should match list1 + list2"
+        assert [rope[i] for i in range(-23, 23)] == expected + expected, "Indexing should find the right leaf"
+        for index in (slice(3, 21), slice(-5, None), slice(None, None, 3), slice(21, 2, -2), slice(None, None, -1)):
+            assert list(rope[index]) == expected[index], f"Slicing with {index} should match lists"
+        assert list(reversed(rope)) == expected[::-1], "Reversal should match lists"
+        assert rope * 3 == expected * 3, "Repetition should match lists"
+        
+        # Repeated appends keep the tree height logarithmic in the number of leaves
+        rope, expected = Rope(), []
+        for i in range(1000):
+            rope = rope + [i % 101]
+            expected.append(i % 101)
+        assert rope == expected, "Appends should keep every step in order"
+        assert rope.depth <= 1.45 * math.log2(1000) + 2, "Appends should keep the rope balanced"
+        assert (Rope(Pattern([1, 2])) * 1000).depth <= 2 * math.log2(1000) + 2, "Doubling should share balanced subtrees"
+        assert isinstance(Rope(Pattern([1]), [2]).copy(), Pattern), "copy() should match the first leaf's storage"
+        
+        # Each lazy layer over a rope adds one level; recorded versions are flattened past the bound
+        from digital_music_mixer import reverse_list
+        from pattern_history import MAX_NESTING, PatternHistory
+        from pattern_types import PatternView, nesting
+        assert nesting([1]) == 0 and nesting(Rope([1], [2])) == 1, "Ropes of lists should be one layer deep"
+        assert nesting(Rope(PatternView(Rope([1], [2])), [3])) == 3, "A rope over a view over a rope should be three deep"
+        pattern = [1, 2]
+        history = PatternHistory(pattern)
+        for i in range(3 * MAX_NESTING):
+            pattern = history.record("Reverse", reverse_list(pattern, view=True))
+            pattern = history.record("Combine", combine_lists(pattern, [i], rope=True))
+            assert nesting(pattern) <= MAX_NESTING, "Recorded versions should stay within the nesting bound"
+        
+        with pytest.raises(TypeError):
+            rope[0] = 1
+        
+        test_obj.yakshaAssert("TestRopeConcatenation", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestRopeConcatenation", False, "functional")
+        pytest.fail(f"Rope concatenation test failed: {str(e)}")
+
+def test_visualize_list_matches_reference(test_obj):
+    """Test that the fast renderer draws exactly what the original renderer drew"""
+    try:
+        import random
+        from digital_music_mixer import visualize_list
+        
+        def reference(pattern):
+            # The original row-by-row renderer
+            result = ["    " + "".join(f"{i % 10}" for i in range(min(len(pattern), 50)))]
+            for row in range(10, 0, -1):
+                line = f"{row:2d} |"
+                for value in pattern[:50]:
+                    try:
+                        line += "█" if int(value) >= row * 10 else " "
+                    except (ValueError, TypeError):
+                        line += "?"
+                result.append(line)
+            result.append("   " + "-" * (min(len(pattern), 50) + 1))
+            result.append("    Values (0-100)")
+            return "\n".join(result)
+        
+        odd_values = [
+            [0, 9, 10, 99, 100, 101, 255, 256, 1000, -1, -50],
+            [0.0, 9.99, 10.0, 55.5, 100.0, 250.7, -0.5, float("nan")],
+            ["50", "7", "5.5", "", "abc", None, [1], {}, True, False],
+            [1] * 80,
+        ]
+        rng = random.Random(2)
+        odd_values += [[rng.choice([rng.randint(-20, 300), rng.uniform(-5, 120), str(rng.randint(0, 100)), None])
+                        for _ in range(rng.randint(1, 60))] for _ in range(50)]
+        for values in odd_values:
+            assert visualize_list(values) == reference(values), f"Rendering {values[:5]}... should match the original"
+            assert visualize_list(list(values)) == reference(values), "Cached frames should match the original"
+        
+        test_obj.yakshaAssert("TestVisualizeListMatchesReference", True, "functional")
+    except Exception as e:
+        test_obj.yakshaAssert("TestVisualizeListMatchesReference", False, "functional")
+        pytest.fail(f"Visualization reference test failed: {str(e)}")
+
 if __name__ == '__main__':
     pytest.main(['-v'])
\ No newline at end of file